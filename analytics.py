@@ -0,0 +1,253 @@
+# analytics.py
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+import cube
+import data_store
+import order_index
+import reductions
+import view_cache
+
+DEFAULT_TIME_RANGE = 30
+HOST = '127.0.0.1'
+PORT = 8502
+# Query parameter -> filter column; a filter that isn't given selects every value
+FILTER_PARAMS = {'priority': 'Priority', 'category': 'Product_Category', 'origin': 'Origin'}
+
+
+class Dataset:
+    # One store version loaded with the indexes the queries need
+    def __init__(self, data_version, store_dir=data_store.STORE_DIR):
+        self.data_version = data_version
+        self.orders = data_store.load_tables(store_dir)[0]
+        self.cells = cube.load(store_dir)
+        self.index = order_index.OrderIndex(self.orders)
+        self.bitmap = order_index.BitmapIndex(self.orders)
+
+    def prefs(self, priorities=None, categories=None, origins=None, time_range=DEFAULT_TIME_RANGE):
+        # Dashboard-style preferences; None selects every value of that filter
+        def values(selected, column):
+            return list(selected) if selected is not None else [str(v) for v in self.orders[column].cat.categories]
+        return {
+            'priorities': values(priorities, 'Priority'),
+            'categories': values(categories, 'Product_Category'),
+            'origins': values(origins, 'Origin'),
+            'time_range': int(time_range),
+        }
+
+
+def select_rows(dataset, prefs):
+    # Row positions of the orders matching the filters within the time range, ascending
+    window = dataset.index.window(prefs['time_range'])[0]
+    return dataset.bitmap.select({
+        'Priority': prefs['priorities'],
+        'Product_Category': prefs['categories'],
+        'Origin': prefs['origins'],
+    }, window)
+
+
+def select_cells(dataset, prefs):
+    _, start, end = dataset.index.window(prefs['time_range'])
+    return cube.select(dataset.cells, prefs['priorities'], prefs['categories'], prefs['origins'], start, end)
+
+
+def kpis(cells):
+    return cube.totals(cells)
+
+
+def express_share(cells):
+    # Percentage of the selected orders that are Express
+    total = cells['orders'].sum()
+    return cells.loc[cells['Priority'] == 'Express', 'orders'].sum() / max(total, 1) * 100
+
+
+def insights(kpis, express_pct):
+    # (message, level) pairs, level being 'success', 'warning' or 'danger'
+    result = []
+
+    # Performance insight
+    if kpis['on_time_rate'] >= 90:
+        result.append(("✅ **Excellent Performance**: Your on-time delivery rate of {:.1f}% exceeds industry standards (85%). Keep up the great work!".format(kpis['on_time_rate']), "success"))
+    elif kpis['on_time_rate'] >= 75:
+        result.append(("⚠️ **Room for Improvement**: On-time rate at {:.1f}%. Consider optimizing routes in high-delay zones.".format(kpis['on_time_rate']), "warning"))
+    else:
+        result.append(("🚨 **Action Required**: On-time rate of {:.1f}% is below target. Immediate operational review recommended.".format(kpis['on_time_rate']), "danger"))
+
+    # Cost insight
+    if kpis['avg_cost_per_km'] < 40:
+        result.append(("💰 **Cost Efficient**: Your average cost of ₹{:.1f}/km is below industry average. Excellent cost management!".format(kpis['avg_cost_per_km']), "success"))
+    else:
+        result.append(("💸 **Cost Optimization**: At ₹{:.1f}/km, consider fuel efficiency programs or route optimization to reduce costs.".format(kpis['avg_cost_per_km']), "warning"))
+
+    # Carbon footprint
+    avg_co2_per_order = kpis['total_co2'] / max(kpis['total_orders'], 1)
+    if avg_co2_per_order < 150:
+        result.append(("🌱 **Eco-Friendly**: Average {:.0f} kg CO₂ per order. Consider carbon offset programs to achieve net-zero.".format(avg_co2_per_order), "success"))
+    else:
+        result.append(("🌍 **Sustainability Focus**: High carbon footprint detected ({:.0f} kg CO₂/order). Recommend electric vehicle adoption for urban routes.".format(avg_co2_per_order), "warning"))
+
+    # Priority analysis
+    if express_pct > 40:
+        result.append(("⚡ **Premium Demand**: {:.0f}% Express orders indicate strong premium segment. Consider capacity expansion.".format(express_pct), "success"))
+
+    # Delay patterns
+    if kpis['avg_delay'] > 120:
+        result.append(("⏱️ **Delay Alert**: Average delay of {:.0f} minutes detected. High-traffic routes need alternative planning.".format(kpis['avg_delay']), "danger"))
+
+    return result
+
+
+def priority_counts(cells):
+    counts = cube.rollup(cells, 'Priority')[['Priority', 'orders']]
+    return counts.sort_values('orders', ascending=False, kind='stable')
+
+
+def category_summary(cells):
+    summary = cube.rollup(cells, 'Product_Category')[['Product_Category', 'orders', 'total_cost_sum', 'on_time_mean', 'co2_kg_sum']]
+    summary.columns = ['Product_Category', 'orders', 'revenue', 'on_time_rate', 'co2_kg']
+    summary['on_time_rate'] = summary['on_time_rate'] * 100
+    return summary
+
+
+def daily_summary(cells):
+    summary = cube.rollup(cells, 'date')[['date', 'orders', 'on_time_mean', 'total_cost_sum']]
+    summary.columns = ['date', 'orders', 'on_time_rate', 'revenue']
+    summary['on_time_rate'] = summary['on_time_rate'] * 100
+    return summary
+
+
+def route_counts(cells):
+    return cube.rollup(cells, ['Origin', 'Destination'])[['Origin', 'Destination', 'orders']]
+
+
+def carrier_summary(orders, rows):
+    summary = reductions.group_means(orders, 'Carrier', 'on_time', rows)
+    summary.columns = ['Carrier', 'orders', 'on_time_rate']
+    summary['on_time_rate'] = summary['on_time_rate'] * 100
+    return summary.sort_values('on_time_rate', ascending=True)
+
+
+def cost_breakdown(cells):
+    # Cost component -> total, in data_store.COST_COLUMNS order
+    return cube.cost_breakdown(cells)
+
+
+def overview(dataset, prefs):
+    # Headline numbers and insights for one set of preferences
+    cells = select_cells(dataset, prefs)
+    totals = kpis(cells)
+    return {'kpis': totals, 'insights': insights(totals, express_share(cells))}
+
+
+# Endpoint name -> JSON-ready result for (dataset, prefs)
+QUERIES = {
+    'kpis': overview,
+    'priorities': lambda dataset, prefs: priority_counts(select_cells(dataset, prefs)),
+    'categories': lambda dataset, prefs: category_summary(select_cells(dataset, prefs)),
+    'daily': lambda dataset, prefs: daily_summary(select_cells(dataset, prefs)),
+    'routes': lambda dataset, prefs: route_counts(select_cells(dataset, prefs)),
+    'carriers': lambda dataset, prefs: carrier_summary(dataset.orders, select_rows(dataset, prefs)),
+    'costs': lambda dataset, prefs: cost_breakdown(select_cells(dataset, prefs)).rename_axis('component').reset_index(name='amount'),
+}
+
+
+def to_json(value):
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient='records', date_format='iso'))
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+class Engine:
+    # Keeps the store current and serves query results from one cache shared by every caller
+    def __init__(self, data_dir=data_store.DATA_DIR, store_dir=data_store.STORE_DIR, max_bytes=view_cache.MAX_BYTES):
+        self.data_dir = data_dir
+        self.store_dir = store_dir
+        self.cache = view_cache.ViewCache(max_bytes)
+        self.dataset = None
+        self.lock = threading.Lock()
+
+    def current(self):
+        # Ingest any CSV changes and reload when the store version moves on
+        with self.lock:
+            data_version = data_store.refresh(self.data_dir, self.store_dir)
+            if self.dataset is None or self.dataset.data_version != data_version:
+                self.dataset = Dataset(data_version, self.store_dir)
+                self.cache.clear()
+            return self.dataset
+
+    def query(self, name, priorities=None, categories=None, origins=None, time_range=DEFAULT_TIME_RANGE):
+        # JSON-encoded result of the QUERIES entry `name`
+        if name not in QUERIES:
+            raise ValueError(f"Unknown query '{name}', expected one of {list(QUERIES)}")
+        dataset = self.current()
+        prefs = dataset.prefs(priorities, categories, origins, time_range)
+        key = (view_cache.view_key(dataset.data_version, prefs), name)
+
+        def compute():
+            result = {'data_version': dataset.data_version, 'filters': prefs, 'result': to_json(QUERIES[name](dataset, prefs))}
+            return json.dumps(result, ensure_ascii=False).encode('utf-8')
+        return self.cache.get(key, compute)
+
+
+class Handler(BaseHTTPRequestHandler):
+    # GET /<query>?priority=Express&priority=Standard&category=...&origin=...&days=30
+    engine = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        name = url.path.strip('/')
+        try:
+            filters = {column: params.get(param) for param, column in FILTER_PARAMS.items()}
+            body = self.engine.query(
+                name,
+                priorities=filters['Priority'],
+                categories=filters['Product_Category'],
+                origins=filters['Origin'],
+                time_range=int(params.get('days', [DEFAULT_TIME_RANGE])[0]),
+            )
+        except ValueError as e:
+            self.respond(404 if name not in QUERIES else 400, json.dumps({'error': str(e)}).encode('utf-8'))
+            return
+        self.respond(200, body)
+
+    def respond(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host=HOST, port=PORT, engine=None):
+    handler = type('EngineHandler', (Handler,), {'engine': engine or Engine()})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f'Serving {list(QUERIES)} on http://{host}:{server.server_port}/')
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve dashboard KPIs and aggregates as JSON')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--data-dir', default=data_store.DATA_DIR)
+    parser.add_argument('--store-dir', default=data_store.STORE_DIR)
+    args = parser.parse_args()
+    serve(args.host, args.port, Engine(args.data_dir, args.store_dir))
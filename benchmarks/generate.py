@@ -0,0 +1,78 @@
+# benchmarks/generate.py
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import data_store
+
+SEED_DIR = data_store.DATA_DIR
+CHUNK_ORDERS = 1_000_000
+# Per-order tables: each synthetic order gets a row with the same probability as in the seed data
+PER_ORDER = ['routes', 'delivery', 'cost', 'feedback']
+# Copied unchanged: warehouse stock doesn't grow with order volume
+FIXED = ['inventory']
+
+
+def read_seed(name, seed_dir=SEED_DIR):
+    # Raw strings, so sampled values are written back exactly as they appear in the seed CSVs
+    return pd.read_csv(os.path.join(seed_dir, data_store.SOURCES[name]), dtype=str, keep_default_na=False)
+
+
+def ids(prefix, start, stop, width):
+    return prefix + pd.Series(np.arange(start + 1, stop + 1)).astype(str).str.zfill(width)
+
+
+def generate(out_dir, n_orders, n_vehicles=None, seed_dir=SEED_DIR, seed=0, chunk_orders=CHUNK_ORDERS):
+    # Write the seven source CSVs to out_dir, scaled to n_orders orders by resampling whole seed rows
+    # (so values within a row stay consistent). Order IDs are renumbered; routes follow each order's
+    # Origin-Destination. Orders are written chunk_orders at a time, so memory doesn't grow with n_orders.
+    if n_orders < 1:
+        raise ValueError(f'n_orders must be at least 1, got {n_orders}')
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    seeds = {name: read_seed(name, seed_dir) for name in ['orders', 'vehicles'] + PER_ORDER}
+    coverage = {name: seeds[name]['Order_ID'].nunique() / seeds['orders']['Order_ID'].nunique() for name in PER_ORDER}
+    width = max(6, len(str(n_orders)))
+
+    for start in range(0, n_orders, chunk_orders):
+        stop = min(start + chunk_orders, n_orders)
+        orders = seeds['orders'].iloc[rng.integers(0, len(seeds['orders']), stop - start)].reset_index(drop=True)
+        orders['Order_ID'] = ids(data_store.ORDER_ID_PREFIX, start, stop, width)
+        tables = {'orders': orders}
+        for name in PER_ORDER:
+            picked = np.flatnonzero(rng.random(len(orders)) < coverage[name])
+            table = seeds[name].iloc[rng.integers(0, len(seeds[name]), len(picked))].reset_index(drop=True)
+            table['Order_ID'] = orders['Order_ID'].to_numpy()[picked]
+            if name == 'routes':
+                table['Route'] = orders['Origin'].to_numpy()[picked] + '-' + orders['Destination'].to_numpy()[picked]
+            tables[name] = table
+        for name, table in tables.items():
+            table.to_csv(os.path.join(out_dir, data_store.SOURCES[name]), index=False, header=start == 0,
+                         mode='w' if start == 0 else 'a')
+
+    n_vehicles = n_vehicles or len(seeds['vehicles'])
+    vehicles = seeds['vehicles'].iloc[rng.integers(0, len(seeds['vehicles']), n_vehicles)].reset_index(drop=True)
+    vehicles['Vehicle_ID'] = ids('VEH', 0, n_vehicles, max(4, len(str(n_vehicles))))
+    vehicles.to_csv(os.path.join(out_dir, data_store.SOURCES['vehicles']), index=False)
+    for name in FIXED:
+        shutil.copy(os.path.join(seed_dir, data_store.SOURCES[name]), os.path.join(out_dir, data_store.SOURCES[name]))
+    return out_dir
+
+
+def parse_size(text):
+    # '10k' -> 10_000, '1M' -> 1_000_000
+    scale = {'k': 10 ** 3, 'm': 10 ** 6}.get(text[-1:].lower(), 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic source CSVs scaled from data/')
+    parser.add_argument('orders', type=parse_size, help='number of orders, e.g. 100k or 10M')
+    parser.add_argument('out_dir')
+    parser.add_argument('--vehicles', type=parse_size, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate(args.out_dir, args.orders, args.vehicles, seed=args.seed)
@@ -0,0 +1,259 @@
+# benchmarks/run.py
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import cube
+import data_store
+import export
+import optimizer
+import order_index
+import predictor
+import reductions
+from benchmarks import generate
+
+DEFAULT_SIZES = '10k,100k'
+# orders x available vehicles for DynamicFleetOptimizer.optimize
+DEFAULT_OPTIMIZE_SIZES = '100x20,500x50,2000x200'
+TRAIN_ROWS = 10_000
+# The dashboard's onboarding defaults
+PREFS = {
+    'priorities': ['Express', 'Standard', 'Economy'],
+    'categories': ['Electronics', 'Fashion', 'Food & Beverage', 'Healthcare', 'Industrial', 'Books', 'Home Goods'],
+    'origins': ['Mumbai', 'Delhi', 'Bangalore', 'Chennai'],
+    'time_range': 30,
+}
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+# A step slower than this ratio against the --compare file is reported as a regression
+REGRESSION_RATIO = 1.2
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class Timer:
+    # Records wall time and the process's peak RSS after each step; a step is run `repeat` times and
+    # the fastest run kept
+    def __init__(self, repeat=1):
+        self.repeat = repeat
+        self.steps = {}
+
+    def __call__(self, name, fn, repeat=None):
+        best = None
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        self.steps[name] = {'seconds': round(best, 6), 'peak_rss_mb': round(peak_rss_mb(), 1)}
+        return result
+
+
+def training_frame(orders):
+    # The features DelayPredictor.predict_batch derives, for orders with a known delay
+    known = orders[orders['delay_min'].notna()]
+    return pd.DataFrame({
+        'Distance_KM': known['Distance_KM'],
+        'weight_kg': known['weight_kg'],
+        'traffic_index': known['Traffic_Delay_Minutes'] / (known['Distance_KM'] / 50 * 60),
+        'hour': known['Order_Date'].dt.hour,
+        'is_rain': 0,
+        'priority_encoded': known['Priority'].astype(str).map({'Economy': 0, 'Standard': 1, 'Express': 2}),
+        'delay_min': known['delay_min'],
+    })
+
+
+def prediction_input(orders):
+    # Weather_Impact isn't joined onto the fact table, so it is passed as missing
+    inputs = orders.reindex(columns=predictor.INPUT_COLUMNS)
+    return inputs.astype({'Priority': str, 'Weather_Impact': object})
+
+
+def run_size(n_orders, work_dir, repeat=1, train_rows=TRAIN_ROWS, predict=True):
+    # One dataset size, end to end. Run in its own process so peak RSS belongs to this size only.
+    timer = Timer(repeat)
+    baseline_rss = peak_rss_mb()
+    data_dir = os.path.join(work_dir, str(n_orders))
+    store_dir = os.path.join(data_dir, 'store')
+    timer('generate', lambda: generate.generate(data_dir, n_orders), repeat=1)
+
+    # load_data: build the store from the CSVs, then what each rerun does
+    timer('store_build', lambda: data_store.refresh(data_dir, store_dir), repeat=1)
+    timer('store_refresh', lambda: data_store.refresh(data_dir, store_dir))
+    orders = timer('load_tables', lambda: data_store.load_tables(store_dir)[0])
+    cells = timer('cube_load', lambda: cube.load(store_dir), repeat=1)
+    index = timer('order_index', lambda: order_index.OrderIndex(orders))
+    bitmap = timer('bitmap_index', lambda: order_index.BitmapIndex(orders))
+
+    # Dashboard filter
+    window, start, end = index.window(PREFS['time_range'])
+    filters = {'Priority': PREFS['priorities'], 'Product_Category': PREFS['categories'], 'Origin': PREFS['origins']}
+    rows = timer('filter_rows', lambda: bitmap.select(filters, window))
+    selected = timer('filter_cells', lambda: cube.select(cells, PREFS['priorities'], PREFS['categories'],
+                                                          PREFS['origins'], start, end))
+    filtered = timer('filter_gather', lambda: orders.iloc[rows])
+
+    # Chart and KPI aggregations, keyed like streamlit_app.VIEW_SECTIONS
+    kpis = timer('kpis', lambda: analytics.kpis(selected))
+    timer('insights', lambda: analytics.insights(kpis, analytics.express_share(selected)))
+    timer('priority', lambda: analytics.priority_counts(selected))
+    timer('category', lambda: analytics.category_summary(selected))
+    timer('carrier', lambda: analytics.carrier_summary(orders, rows))
+    timer('cost_breakdown', lambda: analytics.cost_breakdown(selected))
+    timer('daily', lambda: analytics.daily_summary(selected))
+    timer('route_heatmap', lambda: analytics.route_counts(selected))
+    timer('delay_distance', lambda: (reductions.density_grid(filtered['Distance_KM'], filtered['delay_min']),
+                                     reductions.top_k_by_group(filtered, 'delay_min', 'Priority')))
+    timer('scatter_3d', lambda: reductions.bin_means(filtered, ['Distance_KM', 'total_cost', 'weight_kg'],
+                                                     values=['delay_min']))
+
+    # Export of the filtered orders, newest first as the dashboard writes it
+    export_rows = index.newest_first(rows)
+    for fmt in export.FORMATS:
+        path = timer(f'export_{fmt}', lambda: export.write(orders, export_rows, fmt), repeat=1)
+        os.remove(path)
+
+    if predict:
+        historical = training_frame(orders.iloc[:train_rows])
+        model = timer('predictor_train', lambda: predictor.DelayPredictor(historical), repeat=1)
+        inputs = prediction_input(orders)
+        timer('predict_batch', lambda: model.predict_batch(inputs), repeat=1)
+
+    shutil.rmtree(data_dir, ignore_errors=True)
+    return {'orders': n_orders, 'rows_filtered': int(len(rows)), 'baseline_rss_mb': round(baseline_rss, 1),
+            'peak_rss_mb': round(peak_rss_mb(), 1), 'steps': timer.steps}
+
+
+def run_optimize(sizes, work_dir, repeat=1):
+    # DynamicFleetOptimizer.optimize for each orders x vehicles size, on orders from one generated dataset
+    timer = Timer(repeat)
+    n_orders = max(orders for orders, _ in sizes)
+    n_vehicles = max(vehicles for _, vehicles in sizes)
+    data_dir = os.path.join(work_dir, 'optimize')
+    store_dir = os.path.join(data_dir, 'store')
+    # Enough vehicles that n_vehicles of them are Available
+    generate.generate(data_dir, n_orders, n_vehicles * 4)
+    data_store.refresh(data_dir, store_dir)
+    orders, vehicles = data_store.load_tables(store_dir)[:2]
+    available = vehicles[vehicles['Status'] == 'Available']
+    if len(available) < n_vehicles:
+        raise ValueError(f'Generated {len(available)} available vehicles, need {n_vehicles}')
+    rng = np.random.default_rng(0)
+    traffic = pd.DataFrame({'Order_ID': orders['Order_ID'], 'congestion': rng.random(len(orders)) * 0.5})
+    city_distances = timer('city_distances', lambda: optimizer.CityDistanceMatrix.from_csv(
+        os.path.join(data_dir, data_store.SOURCES['routes'])))
+    for n, v in sizes:
+        batch = orders.iloc[:n].reset_index(drop=True)
+        fleet = available.iloc[:v].reset_index(drop=True)
+        fleet_optimizer = timer(f'optimizer_init_{n}x{v}', lambda: optimizer.DynamicFleetOptimizer(
+            batch, fleet, None, traffic, city_distances))
+        timer(f'optimize_{n}x{v}', lambda: fleet_optimizer.optimize(warm_start=False))
+    shutil.rmtree(data_dir, ignore_errors=True)
+    return {'peak_rss_mb': round(peak_rss_mb(), 1), 'steps': timer.steps}
+
+
+def in_subprocess(fn, *args, **kwargs):
+    # Spawned, not forked, so the child's peak RSS doesn't start from the parent's
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(fn, *args, **kwargs).result()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    # (size, step, old seconds, new seconds, ratio) for every step present in both runs
+    old = {(str(r['orders']), name): step['seconds'] for r in baseline['sizes'] for name, step in r['steps'].items()}
+    old.update({('optimize', name): step['seconds'] for name, step in baseline.get('optimize', {}).get('steps', {}).items()})
+    new = {(str(r['orders']), name): step['seconds'] for r in results['sizes'] for name, step in r['steps'].items()}
+    new.update({('optimize', name): step['seconds'] for name, step in results.get('optimize', {}).get('steps', {}).items()})
+    return [(size, name, old[size, name], seconds, seconds / old[size, name] if old[size, name] else np.inf)
+            for (size, name), seconds in new.items() if (size, name) in old]
+
+
+def parse_optimize_size(text):
+    orders, vehicles = text.lower().split('x')
+    return generate.parse_size(orders), generate.parse_size(vehicles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark load, filter, aggregation, export, optimizer and predictor')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f'order counts, e.g. 10k,100k,1M,10M (default {DEFAULT_SIZES})')
+    parser.add_argument('--optimize-sizes', default=DEFAULT_OPTIMIZE_SIZES,
+                        help=f'orders x vehicles, "" to skip (default {DEFAULT_OPTIMIZE_SIZES})')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per fast step, the fastest is kept')
+    parser.add_argument('--train-rows', type=generate.parse_size, default=TRAIN_ROWS)
+    parser.add_argument('--no-predict', action='store_true', help='skip the predictor steps')
+    parser.add_argument('--work-dir', default=None, help='where generated data goes (default: a temp dir)')
+    parser.add_argument('--output', default=None, help=f'results JSON (default: {RESULTS_DIR}/<commit>-<time>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results JSON to report slowdowns against')
+    args = parser.parse_args()
+
+    sizes = [generate.parse_size(size) for size in args.sizes.split(',') if size]
+    optimize_sizes = [parse_optimize_size(size) for size in args.optimize_sizes.split(',') if size]
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='nexgen_bench_')
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'packages': {'numpy': np.__version__, 'pandas': pd.__version__},
+        'sizes': [],
+    }
+    try:
+        for n in sizes:
+            print(f'{n:,} orders...', flush=True)
+            results['sizes'].append(in_subprocess(run_size, n, work_dir, args.repeat, args.train_rows, not args.no_predict))
+        if optimize_sizes:
+            print('optimizer...', flush=True)
+            results['optimize'] = in_subprocess(run_optimize, optimize_sizes, work_dir, args.repeat)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'local'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for result in results['sizes'] + ([results['optimize']] if 'optimize' in results else []):
+        label = f"{result['orders']:,} orders" if 'orders' in result else 'optimizer'
+        print(f"\n{label} (peak RSS {result['peak_rss_mb']:.0f} MB)")
+        for name, step in result['steps'].items():
+            print(f"  {name:<28}{step['seconds']:>10.4f} s")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = [row for row in compare(results, baseline) if row[4] > REGRESSION_RATIO]
+        print(f"\n{len(regressions)} step(s) over {REGRESSION_RATIO}x slower than {args.compare}")
+        for size, name, old, new, ratio in regressions:
+            print(f'  {size:>10} {name:<28}{old:>10.4f} s -> {new:.4f} s ({ratio:.2f}x)')
+    print(f'\nResults written to {output}')
+
+
+if __name__ == '__main__':
+    main()
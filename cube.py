@@ -0,0 +1,100 @@
+# cube.py
+import threading
+
+import numpy as np
+import pandas as pd
+
+import data_store
+
+# Filter and chart dimensions; 'date' is Order_Date truncated to the day (NaT for undated orders)
+DIMENSIONS = ['Priority', 'Product_Category', 'Origin', 'Destination', 'date']
+# Per-order measures the dashboard sums or averages; each cell holds their sum and non-null count
+MEASURES = ['on_time', 'cost_per_km', 'co2_kg', 'delay_min', 'total_cost']
+# Measures that are only ever summed, so cells hold just their sum
+SUMMED = data_store.COST_COLUMNS
+CELL_COLUMNS = ['orders'] + [f'{m}_{stat}' for m in MEASURES for stat in ('sum', 'count')] + [f'{m}_sum' for m in SUMMED]
+
+# Partition key -> (partition version, cells), per store directory
+_partition_cells = {}
+_lock = threading.Lock()
+
+
+def build(orders):
+    # One cell per observed dimension combination. dropna=False keeps orders with a missing
+    # Destination or Order_Date in the totals; charts grouping on those dimensions drop them.
+    keys = [orders[column] for column in DIMENSIONS[:-1]] + [orders['Order_Date'].dt.normalize().rename('date')]
+    grouped = orders[MEASURES].groupby(keys, observed=True, dropna=False)
+    cells = grouped.sum().add_suffix('_sum').join(grouped.count().add_suffix('_count'))
+    # Summed in float64 so float32 components don't lose precision over many orders
+    summed = orders[SUMMED].astype(np.float64).groupby(keys, observed=True, dropna=False).sum()
+    cells = cells.join(summed.add_suffix('_sum'))
+    cells.insert(0, 'orders', grouped.size())
+    return cells[CELL_COLUMNS].reset_index()
+
+
+def load(store_dir=data_store.STORE_DIR):
+    # Cells for the whole store; only partitions whose version changed since the last call are re-aggregated
+    with data_store.store_lock(store_dir, shared=True), _lock:
+        versions = data_store.partition_versions(store_dir)
+        cached = _partition_cells.setdefault(store_dir, {})
+        for key in set(cached) - set(versions):
+            del cached[key]
+        stale = [key for key, version in versions.items() if key not in cached or cached[key][0] != version]
+        if stale:
+            # One groupby over every stale partition (all of them on a cold start) rather than one
+            # per day, split back into partitions by each cell's date
+            cells = build(pd.concat([data_store.read_partition(key, store_dir) for key in stale], ignore_index=True))
+            keys = cells['date'].dt.strftime('%Y-%m-%d').fillna(data_store.UNDATED).to_numpy()
+            for key in stale:
+                cached[key] = (versions[key], cells[keys == key].reset_index(drop=True))
+        parts = [cells for _, cells in cached.values()]
+    if not parts:
+        return pd.DataFrame(columns=DIMENSIONS + CELL_COLUMNS)
+    cells = pd.concat(parts, ignore_index=True)
+    # Partitions carry their own category sets; unify them after the concat
+    for column in DIMENSIONS[:-1]:
+        cells[column] = cells[column].astype('category')
+    return cells
+
+
+def select(cells, priorities, categories, origins, start=None, end=None):
+    # start/end bound the day (inclusive); undated cells fall outside any window
+    mask = (cells['Priority'].isin(priorities) &
+            cells['Product_Category'].isin(categories) &
+            cells['Origin'].isin(origins))
+    if start is not None:
+        mask &= cells['date'] >= start
+    if end is not None:
+        mask &= cells['date'] <= end
+    return cells[mask]
+
+
+def totals(cells):
+    # Headline metrics, matching what the dashboard computes from the filtered orders
+    sums = cells[CELL_COLUMNS].sum()
+
+    def mean(measure):
+        count = sums[f'{measure}_count']
+        return sums[f'{measure}_sum'] / count if count else 0
+
+    return {
+        'total_orders': int(sums['orders']),
+        'on_time_rate': mean('on_time') * 100,
+        'avg_cost_per_km': mean('cost_per_km'),
+        'total_co2': sums['co2_kg_sum'] if sums['co2_kg_count'] else 0,
+        'avg_delay': mean('delay_min'),
+        'total_revenue': sums['total_cost_sum'] if sums['total_cost_count'] else 0,
+    }
+
+
+def cost_breakdown(cells):
+    # Total of each cost component (data_store.COST_COLUMNS order) over the cells
+    return pd.Series({column: cells[f'{column}_sum'].sum() for column in SUMMED})
+
+
+def rollup(cells, by):
+    # Cells summed over the `by` dimensions, with a <measure>_mean column per measure (NaN if no values)
+    grouped = cells.groupby(by, observed=True)[CELL_COLUMNS].sum()
+    for measure in MEASURES:
+        grouped[f'{measure}_mean'] = grouped[f'{measure}_sum'] / grouped[f'{measure}_count'].replace(0, np.nan)
+    return grouped.reset_index()
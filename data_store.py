@@ -0,0 +1,524 @@
+# data_store.py
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+try:
+    import fcntl
+except ImportError:  # Windows: the store is only locked within one process
+    fcntl = None
+
+DATA_DIR = 'data'
+STORE_DIR = os.path.join(DATA_DIR, 'store')
+STORE_FORMAT = 9
+SOURCES = {
+    'orders': 'orders.csv',
+    'vehicles': 'vehicle_fleet.csv',
+    'routes': 'routes_distance.csv',
+    'delivery': 'delivery_performance.csv',
+    'feedback': 'customer_feedback.csv',
+    'cost': 'cost_breakdown.csv',
+    'inventory': 'warehouse_inventory.csv',
+}
+# Append-only sources get new rows added at the end and are ingested from the last byte offset;
+# snapshots are small and simply reloaded when they change
+APPEND_ONLY = ['orders', 'routes', 'delivery', 'cost', 'feedback']
+SNAPSHOTS = ['vehicles', 'inventory']
+COST_COLUMNS = [
+    'Fuel_Cost', 'Labor_Cost', 'Vehicle_Maintenance', 'Insurance',
+    'Packaging_Cost', 'Technology_Platform_Fee', 'Other_Overhead'
+]
+# Per-order columns joined onto the orders fact table, by source
+SATELLITES = {
+    'routes': ['Distance_KM', 'Traffic_Delay_Minutes'],
+    'delivery': ['Carrier', 'Delivery_Status', 'Customer_Rating', 'on_time', 'delay_min'],
+    'cost': ['total_cost'] + COST_COLUMNS,
+}
+FACT_COLUMNS = ['co2_kg', 'cost_per_km', 'status']
+# Tables the dashboard reads back, in load_tables() order
+TABLES = ['orders', 'vehicles', 'delivery', 'feedback', 'inventory']
+CATEGORICAL_COLUMNS = ['Priority', 'Product_Category', 'Origin', 'Destination', 'Carrier']
+WEIGHT_RANGES = {
+    'Electronics': (1, 10), 'Fashion': (0.3, 2), 'Food & Beverage': (2, 30),
+    'Healthcare': (0.5, 6), 'Industrial': (15, 120), 'Books': (0.4, 4), 'Home Goods': (5, 40)
+}
+DEFAULT_WEIGHT_RANGE = (1, 10)
+ORDER_ID_PREFIX = 'ORD'
+# Longest digit run order_keys() can pack into an int64 alongside its length
+ORDER_ID_DIGITS = 17
+ORDER_ID_PATTERN = rf'{ORDER_ID_PREFIX}\d{{1,{ORDER_ID_DIGITS}}}'
+HASH_CHUNK_BYTES = 1 << 20
+# Bytes before the ingested offset re-hashed on every change check; refresh(verify=True) hashes them all
+TAIL_HASH_BYTES = 1 << 16
+# order_index parts kept before an append merges them into one
+ORDER_INDEX_PARTS = 8
+UNDATED = 'undated'
+
+_refresh_lock = threading.Lock()
+
+
+# Derivation, shared by full builds and appends
+
+def clean_orders(orders):
+    orders = keyed_rows(orders)
+    orders['Special_Handling'] = orders['Special_Handling'].fillna('None')
+    orders['Order_Date'] = pd.to_datetime(orders['Order_Date'], errors='coerce')
+    orders['weight_kg'] = derive_weights(orders['Order_ID'], orders['Product_Category'])
+    return orders
+
+
+def order_uniform(order_ids):
+    # Uniform [0, 1) draw per Order_ID from a stable 64-bit hash: the same order always gets the
+    # same value, whatever file, chunk or row position it is loaded from
+    # (categorize=False: IDs are nearly all distinct, so factorizing first only costs time)
+    hashes = pd.util.hash_array(np.asarray(order_ids, dtype=object), categorize=False)
+    return (hashes >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+def derive_weights(order_ids, categories):
+    # Per-category low/high lookup; unknown categories get code -1, which picks the default appended last
+    codes = pd.Categorical(categories, categories=list(WEIGHT_RANGES)).codes
+    low, high = np.array(list(WEIGHT_RANGES.values()) + [DEFAULT_WEIGHT_RANGE], dtype=float).T
+    return np.round(low[codes] + order_uniform(order_ids) * (high[codes] - low[codes]), 2)
+
+
+def derive_satellites(raw):
+    routes, delivery, cost = raw['routes'], raw['delivery'], raw['cost']
+    routes['Weather_Impact'] = routes['Weather_Impact'].fillna('None')
+    delivery['Quality_Issue'] = delivery['Quality_Issue'].fillna('Perfect')
+
+    delivery['delay_days'] = delivery['Actual_Delivery_Days'] - delivery['Promised_Delivery_Days']
+    delivery['delay_min'] = np.maximum(delivery['delay_days'], 0) * 1440
+    delivery['on_time'] = (delivery['delay_days'] <= 0).astype(int)
+
+    cost['total_cost'] = cost[COST_COLUMNS].sum(axis=1)
+    # Components are only ever summed for charts; float32 halves their footprint in the fact table
+    cost[COST_COLUMNS] = cost[COST_COLUMNS].astype(np.float32)
+
+    return {name: key_satellite(raw[name][['Order_ID'] + columns]) for name, columns in SATELLITES.items()}
+
+
+def keyed_rows(frame):
+    # Rows whose Order_ID order_keys() can key; blank or malformed IDs are left out of the store
+    valid = frame['Order_ID'].fillna('').astype(str).str.fullmatch(ORDER_ID_PATTERN).to_numpy(dtype=bool)
+    return frame if valid.all() else frame[valid].copy()
+
+
+def order_keys(order_ids):
+    # The integer key per-order tables are sorted and joined on: the number and its digit count,
+    # so differently padded IDs stay distinct ('ORD000123' -> 123 * 18 + 6, 'ORD123' -> 123 * 18 + 3)
+    digits = pd.Series(order_ids).str.removeprefix(ORDER_ID_PREFIX)
+    return digits.astype('int64').to_numpy() * (ORDER_ID_DIGITS + 1) + digits.str.len().to_numpy()
+
+
+def key_satellite(satellite):
+    # One row per order (a later row replaces an earlier one), sorted by order_key for lookup()
+    satellite = keyed_rows(satellite)
+    keys = order_keys(satellite['Order_ID'])
+    unique, rows = last_rows(keys)
+    return satellite.iloc[rows].reset_index(drop=True).assign(order_key=unique)
+
+
+def last_rows(keys):
+    # (sorted distinct keys, row of each one's last occurrence); np.unique over the reversed keys
+    # finds the last rows and sorts in the same pass
+    unique, last = np.unique(keys[::-1], return_index=True)
+    return unique, len(keys) - 1 - last
+
+
+def lookup(table_keys, keys):
+    # Row of each key in the sorted table_keys, or -1 where it is absent
+    rows = np.searchsorted(table_keys, keys)
+    found = rows < len(table_keys)
+    found[found] = table_keys[rows[found]] == keys[found]
+    return np.where(found, rows, -1)
+
+
+def gather(column, rows, index):
+    # column values at rows, NaN for -1 (a left join without building a merged frame). Tables are
+    # kept on a RangeIndex, so the reindex is positional and dtypes follow merge's rules
+    return column.reindex(rows).set_axis(index)
+
+
+def join_satellites(orders, satellites):
+    keys = order_keys(orders['Order_ID'])
+    for name, columns in SATELLITES.items():
+        rows = lookup(satellites[name]['order_key'].to_numpy(), keys)
+        for column in columns:
+            orders[column] = gather(satellites[name][column], rows, orders.index)
+    return orders
+
+
+def derive_facts(orders):
+    orders['co2_kg'] = orders['Distance_KM'] * 0.4
+    orders['cost_per_km'] = orders['total_cost'] / orders['Distance_KM'].replace(0, np.nan)
+
+    cutoff_date = datetime(2025, 11, 1) - timedelta(days=30)
+    orders['status'] = np.where(orders['Order_Date'] >= cutoff_date, 'Pending', 'Completed')
+
+    for column in CATEGORICAL_COLUMNS:
+        orders[column] = orders[column].astype('category')
+    return orders
+
+
+def partition_keys(orders):
+    # One partition per Order_Date day, so an append rewrites only the days it touches
+    return orders['Order_Date'].dt.strftime('%Y-%m-%d').fillna(UNDATED).to_numpy()
+
+
+def index_orders(orders):
+    # order_key -> partition for these orders, sorted by order_key for lookup()
+    keys = order_keys(orders['Order_ID'])
+    order = np.argsort(keys, kind='stable')
+    return pd.DataFrame({'order_key': keys[order], 'partition': partition_keys(orders)[order]})
+
+
+# Source files: read from a byte offset and detect appends
+
+def read_csv_from(path, offset=0):
+    # Rows after byte `offset`, parsed with the file's header; returns (frame, offset of end of file)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        start = max(offset, len(header))
+        f.seek(start)
+        body = f.read()
+    return pd.read_csv(io.BytesIO(header + body)), start + len(body)
+
+
+def range_hash(path, start, end):
+    # SHA-256 of bytes [start, end); far cheaper than parsing them
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(remaining, HASH_CHUNK_BYTES))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def source_state(path, offset, previous=None):
+    # `segments` holds [end offset, hash] per ingest; extending `previous` hashes only the new bytes
+    segments = list(previous['segments']) if previous else []
+    start = segments[-1][0] if segments else 0
+    if offset > start:
+        segments.append([offset, range_hash(path, start, offset)])
+    with open(path, 'rb') as f:
+        f.seek(max(offset - 1, 0))
+        last = f.read(min(offset, 1))
+    return {'offset': offset, 'mtime_ns': os.stat(path).st_mtime_ns, 'size': offset,
+            'tail_sha256': range_hash(path, max(offset - TAIL_HASH_BYTES, 0), offset),
+            'segments': segments, 'ends_with_newline': last == b'\n'}
+
+
+def ingested_intact(path, state, verify=False):
+    # The tail catches edits near the end and rewrites of the same length or longer; verify
+    # re-hashes every ingested segment, for edits further back that kept size and tail
+    if not verify:
+        return range_hash(path, max(state['offset'] - TAIL_HASH_BYTES, 0), state['offset']) == state['tail_sha256']
+    starts = [0] + [end for end, _ in state['segments'][:-1]]
+    return all(range_hash(path, start, end) == digest
+               for start, (end, digest) in zip(starts, state['segments']))
+
+
+def source_change(path, state, verify=False):
+    # 'unchanged', 'appended' (only new rows after the recorded offset) or 'rewritten'
+    stat = os.stat(path)
+    if not verify and stat.st_size == state['offset'] and stat.st_mtime_ns == state['mtime_ns']:
+        return 'unchanged'
+    if stat.st_size < state['offset'] or not ingested_intact(path, state, verify):
+        return 'rewritten'
+    if stat.st_size == state['offset']:
+        return 'unchanged'
+    return 'appended' if state['ends_with_newline'] else 'rewritten'
+
+
+# Store layout: orders/<day>.arrow fact partitions, <table>/part-<generation>.arrow for
+# append-only tables, <snapshot>.arrow, pending/<satellite>.arrow for rows whose order
+# hasn't arrived yet, and manifest.json tying it together
+
+def write_table(frame, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Uncompressed Arrow IPC so reads can memory-map it. Written aside and swapped in: the old file
+    # may still be mapped by a reader (or by the partition being rewritten)
+    feather.write_feather(frame.reset_index(drop=True), f'{path}.tmp', compression='uncompressed')
+    os.replace(f'{path}.tmp', path)
+
+
+def read_table(path):
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def read_parts(store_dir, name):
+    directory = os.path.join(store_dir, name)
+    paths = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+    frames = [read_table(os.path.join(directory, path)) for path in paths]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+def read_manifest(store_dir=STORE_DIR):
+    try:
+        with open(os.path.join(store_dir, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return manifest if manifest.get('format') == STORE_FORMAT else None
+
+
+def write_manifest(manifest, store_dir=STORE_DIR):
+    manifest['version'] = f"{manifest['build_id']}-{manifest['generation']}"
+    path = os.path.join(store_dir, 'manifest.json')
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+
+def write_partitions(orders, store_dir, manifest, stale_keys=()):
+    # Upsert `orders` into their day partitions; stale_keys are partitions that may hold an older
+    # copy of one of these orders (e.g. its Order_Date changed) and must drop it
+    keys = partition_keys(orders)
+    replaced = order_keys(orders['Order_ID'])
+    for key in set(keys) | set(stale_keys):
+        path = os.path.join(store_dir, 'orders', f'{key}.arrow')
+        frames = [orders[keys == key]]
+        if key in manifest['partitions']:
+            existing = read_table(path)
+            frames.insert(0, existing[~np.isin(order_keys(existing['Order_ID']), replaced)])
+        partition = pd.concat(frames, ignore_index=True)
+        if len(partition):
+            write_table(partition, path)
+            manifest['partitions'][key] = {'rows': len(partition), 'version': f"{manifest['build_id']}-{manifest['generation']}"}
+        elif key in manifest['partitions']:
+            os.remove(path)
+            del manifest['partitions'][key]
+
+
+def write_order_index(orders, store_dir, part):
+    # One sorted part per write; past ORDER_INDEX_PARTS they are merged, a later part's entry winning
+    directory = os.path.join(store_dir, 'order_index')
+    write_table(index_orders(orders), os.path.join(directory, part))
+    paths = sorted(os.listdir(directory))
+    if len(paths) > ORDER_INDEX_PARTS:
+        merged = pd.concat([read_table(os.path.join(directory, path)) for path in paths], ignore_index=True)
+        rows = last_rows(merged['order_key'].to_numpy())[1]
+        write_table(merged.iloc[rows], os.path.join(directory, part))
+        for path in paths[:-1]:
+            os.remove(os.path.join(directory, path))
+
+
+def find_partitions(store_dir, keys):
+    # Partition holding each order_key, None where the order isn't stored. Parts are probed newest
+    # first and only for keys not found yet, so the cost follows len(keys) rather than the store
+    partitions = np.full(len(keys), None, dtype=object)
+    missing = np.ones(len(keys), dtype=bool)
+    directory = os.path.join(store_dir, 'order_index')
+    for path in sorted(os.listdir(directory), reverse=True):
+        if not missing.any():
+            break
+        part = feather.read_table(os.path.join(directory, path), memory_map=True)
+        probe = np.flatnonzero(missing)
+        rows = lookup(part['order_key'].to_numpy(), keys[probe])
+        found = rows >= 0
+        partitions[probe[found]] = part['partition'].take(rows[found]).to_numpy(zero_copy_only=False)
+        missing[probe[found]] = False
+    return partitions
+
+
+def build_store(data_dir=DATA_DIR, store_dir=STORE_DIR):
+    # Built in a sibling temp dir and renamed into place, so the old store stays readable meanwhile
+    parent = os.path.dirname(os.path.abspath(store_dir))
+    os.makedirs(parent, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix=f'.{os.path.basename(store_dir)}.build-', dir=parent)
+    try:
+        manifest = write_store(data_dir, build_dir)
+    except Exception:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    old_dir = None
+    if os.path.exists(store_dir):
+        old_dir = tempfile.mkdtemp(prefix=f'.{os.path.basename(store_dir)}.old-', dir=parent)
+        os.replace(store_dir, os.path.join(old_dir, 'store'))
+    os.replace(build_dir, store_dir)
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+    return manifest
+
+
+def write_store(data_dir, store_dir):
+    manifest = {'format': STORE_FORMAT, 'build_id': uuid.uuid4().hex[:8], 'generation': 0,
+                'sources': {}, 'partitions': {}}
+    raw = {}
+    for name, filename in SOURCES.items():
+        path = os.path.join(data_dir, filename)
+        raw[name], offset = read_csv_from(path)
+        manifest['sources'][name] = source_state(path, offset)
+
+    satellites = derive_satellites(raw)
+    # A re-sent order replaces the earlier row, as in append()
+    orders = clean_orders(raw['orders'].drop_duplicates('Order_ID', keep='last'))
+    orders = derive_facts(join_satellites(orders, satellites))
+    write_partitions(orders, store_dir, manifest)
+    write_order_index(orders, store_dir, 'part-00000.arrow')
+    for name, satellite in satellites.items():
+        write_table(satellite[~satellite['Order_ID'].isin(orders['Order_ID'])], os.path.join(store_dir, 'pending', f'{name}.arrow'))
+    for name in ['delivery', 'feedback']:
+        write_table(raw[name], os.path.join(store_dir, name, 'part-00000.arrow'))
+    for name in SNAPSHOTS:
+        write_table(raw[name], os.path.join(store_dir, f'{name}.arrow'))
+    write_manifest(manifest, store_dir)
+    return manifest
+
+
+def append(data_dir, store_dir, manifest, changes):
+    # Ingest only what changed: new rows of append-only sources, whole snapshots
+    manifest['generation'] += 1
+    part = f"part-{manifest['generation']:05d}.arrow"
+    raw = {}
+    for name in APPEND_ONLY:
+        path = os.path.join(data_dir, SOURCES[name])
+        raw[name], offset = read_csv_from(path, manifest['sources'][name]['offset'])
+        manifest['sources'][name] = source_state(path, offset, manifest['sources'][name])
+
+    new_orders = clean_orders(raw['orders'].drop_duplicates('Order_ID', keep='last'))
+    satellites = derive_satellites(raw)
+    for name in SATELLITES:
+        # Rows that arrived before their order are retried on every append
+        pending = read_table(os.path.join(store_dir, 'pending', f'{name}.arrow'))
+        satellites[name] = key_satellite(pd.concat([pending, satellites[name]], ignore_index=True))
+
+    # Stored orders that are re-sent or receive new satellite rows are re-derived as well
+    touched = np.unique(np.concatenate([satellites[name]['order_key'].to_numpy() for name in SATELLITES]
+                                       + [order_keys(new_orders['Order_ID'])]))
+    partitions = find_partitions(store_dir, touched)
+    stored_keys = pd.notna(partitions)
+    affected_keys, affected_partitions = touched[stored_keys], set(partitions[stored_keys])
+    stored = pd.concat([read_table(os.path.join(store_dir, 'orders', f'{key}.arrow'))
+                        for key in affected_partitions] or [pd.DataFrame({'Order_ID': pd.Series(dtype=object)})], ignore_index=True)
+    stored = stored[np.isin(order_keys(stored['Order_ID']), affected_keys)]
+    satellite_columns = [column for columns in SATELLITES.values() for column in columns]
+    base_columns = [column for column in stored.columns if column not in satellite_columns + FACT_COLUMNS]
+
+    delta = pd.concat([stored.loc[~stored['Order_ID'].isin(new_orders['Order_ID']), base_columns], new_orders],
+                      ignore_index=True)
+    delta_keys = order_keys(delta['Order_ID'])
+    # Start from the stored satellite values and overlay whatever arrived in this append
+    stored = stored.assign(order_key=order_keys(stored['Order_ID'])).sort_values('order_key', ignore_index=True)
+    rows = lookup(stored['order_key'].to_numpy(), delta_keys)
+    for column in satellite_columns:
+        if column in stored:
+            delta[column] = gather(stored[column], rows, delta.index)
+    for name, columns in SATELLITES.items():
+        satellite = satellites[name]
+        rows = lookup(satellite['order_key'].to_numpy(), delta_keys)
+        for column in columns:
+            update = gather(satellite[column], rows, delta.index)
+            delta[column] = update.where(rows >= 0, delta[column]) if column in delta else update
+        # Every stored order a satellite row names is in the delta, so the rest are still pending
+        pending = ~np.isin(satellite['order_key'].to_numpy(), delta_keys)
+        write_table(satellite[pending], os.path.join(store_dir, 'pending', f'{name}.arrow'))
+    delta = derive_facts(delta)
+
+    write_partitions(delta, store_dir, manifest, stale_keys=affected_partitions)
+    if len(delta):
+        write_order_index(delta, store_dir, part)
+    for name in ['delivery', 'feedback']:
+        if len(raw[name]):
+            write_table(raw[name], os.path.join(store_dir, name, part))
+    for name in SNAPSHOTS:
+        if changes[name] != 'unchanged':
+            path = os.path.join(data_dir, SOURCES[name])
+            table, offset = read_csv_from(path)
+            write_table(table, os.path.join(store_dir, f'{name}.arrow'))
+            manifest['sources'][name] = source_state(path, offset)
+    write_manifest(manifest, store_dir)
+    return manifest
+
+
+@contextmanager
+def store_lock(store_dir=STORE_DIR, shared=False):
+    # Across threads and processes (the dashboard and the analytics server share data/store): a
+    # refresh holds it exclusively, readers hold it shared so files aren't replaced mid-read
+    if fcntl is None:
+        with nullcontext() if shared else _refresh_lock:
+            yield
+        return
+    parent = os.path.dirname(os.path.abspath(store_dir))
+    os.makedirs(parent, exist_ok=True)
+    # flock locks belong to the open file, so each caller opens its own
+    with open(os.path.join(parent, f'.{os.path.basename(store_dir)}.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def refresh(data_dir=DATA_DIR, store_dir=STORE_DIR, verify=False):
+    # Bring the store up to date with the CSVs and return its version for cache keys. Rows appended
+    # to the end of a CSV are ingested incrementally; any other edit triggers a full rebuild.
+    # Ingested bytes are checked by their tail unless verify=True, which re-hashes all of them.
+    with store_lock(store_dir):
+        return update_store(data_dir, store_dir, verify)
+
+
+def update_store(data_dir, store_dir, verify=False):
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        return build_store(data_dir, store_dir)['version']
+    # Snapshots are small enough to always verify in full
+    changes = {name: source_change(os.path.join(data_dir, filename), manifest['sources'][name],
+                                   verify or name in SNAPSHOTS)
+               for name, filename in SOURCES.items()}
+    if any(changes[name] == 'rewritten' for name in APPEND_ONLY):
+        return build_store(data_dir, store_dir)['version']
+    touched = False
+    for name, filename in SOURCES.items():
+        mtime_ns = os.stat(os.path.join(data_dir, filename)).st_mtime_ns
+        if changes[name] == 'unchanged' and mtime_ns != manifest['sources'][name]['mtime_ns']:
+            # Touched but not edited: record the new mtime so later refreshes skip the hash again
+            manifest['sources'][name]['mtime_ns'] = mtime_ns
+            touched = True
+    if all(change == 'unchanged' for change in changes.values()):
+        if touched:
+            write_manifest(manifest, store_dir)
+        return manifest['version']
+    return append(data_dir, store_dir, manifest, changes)['version']
+
+
+def partition_versions(store_dir=STORE_DIR):
+    # Day -> version; a day's version changes only when an append rewrites that partition
+    manifest = read_manifest(store_dir)
+    return {key: meta['version'] for key, meta in manifest['partitions'].items()} if manifest else {}
+
+
+def read_partition(key, store_dir=STORE_DIR):
+    return read_table(os.path.join(store_dir, 'orders', f'{key}.arrow'))
+
+
+def load_tables(store_dir=STORE_DIR):
+    with store_lock(store_dir, shared=True):
+        manifest = read_manifest(store_dir)
+        keys = sorted(key for key in manifest['partitions'] if key != UNDATED)
+        keys += [UNDATED] if UNDATED in manifest['partitions'] else []
+        orders = pd.concat([read_partition(key, store_dir) for key in keys], ignore_index=True)
+        vehicles = read_table(os.path.join(store_dir, 'vehicles.arrow'))
+        inventory = read_table(os.path.join(store_dir, 'inventory.arrow'))
+        delivery, feedback = read_parts(store_dir, 'delivery'), read_parts(store_dir, 'feedback')
+    # Partitions carry their own category sets; unify them after the concat
+    for column in CATEGORICAL_COLUMNS:
+        orders[column] = orders[column].astype('category')
+    return orders, vehicles, delivery, feedback, inventory
@@ -0,0 +1,182 @@
+# export.py
+import gzip
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Fact table column -> export header, in export order
+EXPORT_COLUMNS = {
+    'Order_ID': 'Order ID',
+    'Order_Date': 'Order Date',
+    'Priority': 'Priority Level',
+    'Product_Category': 'Product Category',
+    'Origin': 'Origin City',
+    'Destination': 'Destination City',
+    'Distance_KM': 'Distance (KM)',
+    'Traffic_Delay_Minutes': 'Traffic Delay (Minutes)',
+    'Weather_Impact': 'Weather Impact',
+    'weight_kg': 'Weight (KG)',
+    'Delivery_Status': 'Delivery Status',
+    'Customer_Rating': 'Customer Rating (1-5)',
+    'delay_min': 'Total Delay (Minutes)',
+    'on_time': 'On-Time Delivery (1=Yes, 0=No)',
+    'total_cost': 'Total Cost (₹)',
+    'cost_per_km': 'Cost per KM (₹)',
+    'co2_kg': 'CO2 Emissions (KG)',
+    'status': 'Order Status'
+}
+ROUNDED_COLUMNS = ['Distance (KM)', 'Weight (KG)', 'Total Cost (₹)', 'Cost per KM (₹)', 'CO2 Emissions (KG)']
+# Summary row statistics: header -> (statistic, format)
+SUMMARY_STATS = {
+    'Distance (KM)': ('sum', '{:.2f}'),
+    'Traffic Delay (Minutes)': ('sum', '{:.0f}'),
+    'Weight (KG)': ('sum', '{:.2f}'),
+    'Customer Rating (1-5)': ('mean', '{:.2f}'),
+    'Total Delay (Minutes)': ('sum', '{:.0f}'),
+    'On-Time Delivery (1=Yes, 0=No)': ('percent', '{:.1f}%'),
+    'Total Cost (₹)': ('sum', '{:.2f}'),
+    'Cost per KM (₹)': ('mean', '{:.2f}'),
+    'CO2 Emissions (KG)': ('sum', '{:.2f}'),
+}
+DISTINCT_COUNTS = {'Product Category': 'Categories', 'Origin City': 'Origins', 'Destination City': 'Destinations'}
+# format -> (file suffix, MIME type)
+FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+CHUNK_ROWS = 100_000
+# Prepared exports live here until downloaded or swept; a session that simply closes never deletes its
+# file, so anything older than EXPORT_TTL_S is removed by remove_stale()
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), 'nexgen_exports')
+EXPORT_TTL_S = 60 * 60
+# Full timestamps, as the report has always written them
+CSV_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def export_columns(orders):
+    return [column for column in EXPORT_COLUMNS if column in orders.columns]
+
+
+def iter_chunks(orders, rows, chunk_rows=CHUNK_ROWS):
+    # Export-ready frames of at most chunk_rows rows, gathered straight from `orders` by row
+    # position (only the exported columns), so memory is bounded by the chunk size
+    positions = [orders.columns.get_loc(column) for column in export_columns(orders)]
+    for start in range(0, len(rows), chunk_rows):
+        chunk = orders.iloc[rows[start:start + chunk_rows], positions].rename(columns=EXPORT_COLUMNS)
+        for column in ROUNDED_COLUMNS:
+            if column in chunk:
+                chunk[column] = chunk[column].round(2)
+        yield chunk
+
+
+def summary_row(orders, rows, chunk_rows=CHUNK_ROWS):
+    # The report's summary line, accumulated chunk by chunk
+    sums = {column: 0.0 for column in SUMMARY_STATS}
+    counts = {column: 0 for column in SUMMARY_STATS}
+    distinct = {column: set() for column in DISTINCT_COUNTS}
+    for chunk in iter_chunks(orders, rows, chunk_rows):
+        for column in SUMMARY_STATS:
+            if column in chunk:
+                sums[column] += chunk[column].sum()
+                counts[column] += int(chunk[column].count())
+        for column in DISTINCT_COUNTS:
+            if column in chunk:
+                distinct[column].update(chunk[column].dropna().unique())
+
+    headers = set(EXPORT_COLUMNS[column] for column in export_columns(orders))
+    row = {
+        'Order ID': 'SUMMARY STATISTICS',
+        'Order Date': f'Report Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}',
+        'Priority Level': f'Total Orders: {len(rows)}',
+    }
+    for column, label in DISTINCT_COUNTS.items():
+        row[column] = f'{label}: {len(distinct[column]) if column in headers else "N/A"}'
+    for column, (stat, fmt) in SUMMARY_STATS.items():
+        if column not in headers:
+            row[column] = 'N/A'
+            continue
+        value = sums[column] if stat == 'sum' else sums[column] / counts[column] if counts[column] else np.nan
+        row[column] = fmt.format(value * 100 if stat == 'percent' else value)
+    row.update({'Weather Impact': 'Various', 'Delivery Status': 'Multiple', 'Order Status': 'Summary'})
+    return pd.DataFrame([{header: row[header] for header in EXPORT_COLUMNS.values()}])
+
+
+def write_csv(handle, orders, rows, chunk_rows=CHUNK_ROWS):
+    # Header, summary line and two blank lines, then the orders
+    summary = summary_row(orders, rows, chunk_rows)
+    summary.to_csv(handle, index=False)
+    handle.write((',' * (len(summary.columns) - 1) + '\n') * 2)
+    for chunk in iter_chunks(orders, rows, chunk_rows):
+        chunk.reindex(columns=summary.columns).to_csv(handle, header=False, index=False, date_format=CSV_DATE_FORMAT)
+
+
+def arrow_schema(orders):
+    # Fixed up front so every chunk is written with the same types (a chunk whose values are all
+    # missing would otherwise infer a null column)
+    fields = []
+    for column in export_columns(orders):
+        dtype = orders[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtype = dtype.categories.dtype
+        if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_dtype(dtype):
+            fields.append(pa.field(EXPORT_COLUMNS[column], pa.from_numpy_dtype(np.dtype(dtype))))
+        else:
+            fields.append(pa.field(EXPORT_COLUMNS[column], pa.string()))
+    return pa.schema(fields)
+
+
+def write_parquet(path, orders, rows, chunk_rows=CHUNK_ROWS):
+    # Orders only: a typed file has no place for the CSV's summary line
+    schema = arrow_schema(orders)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in iter_chunks(orders, rows, chunk_rows):
+            for column in chunk.columns:
+                if isinstance(chunk[column].dtype, pd.CategoricalDtype):
+                    chunk[column] = chunk[column].astype(chunk[column].cat.categories.dtype)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write(orders, rows, fmt='csv', chunk_rows=CHUNK_ROWS, directory=EXPORT_DIR):
+    # Write the orders at row positions `rows` (in that order) to a new file in `directory` and return
+    # its path; the caller deletes it when done, or remove_stale() does once it expires
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {list(FORMATS)}")
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix='nexgen_export_', suffix=FORMATS[fmt][0], dir=directory)
+    os.close(fd)
+    try:
+        if fmt == 'parquet':
+            write_parquet(path, orders, rows, chunk_rows)
+        else:
+            opener = gzip.open if fmt == 'csv.gz' else open
+            with opener(path, 'wt', encoding='utf-8', newline='') as handle:
+                write_csv(handle, orders, rows, chunk_rows)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def remove_stale(directory=EXPORT_DIR, max_age_s=EXPORT_TTL_S):
+    # Delete exports last modified more than max_age_s ago; returns how many were removed
+    cutoff = time.time() - max_age_s
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:  # removed by another session's sweep
+            pass
+    return removed
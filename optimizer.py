@@ -1,82 +1,467 @@
-# optimizer.py
-from ortools.linear_solver import pywraplp
-import numpy as np
-import pandas as pd
-
-class DynamicFleetOptimizer:
-    def __init__(self, orders, vehicles, historical, traffic):
-        self.orders = orders
-        self.vehicles = vehicles[vehicles['Status'] == 'Available']
-        self.historical = historical
-        self.traffic = traffic
-
-    def compute_cost(self, order, vehicle):
-        dist = order['Distance_KM']
-        avg_speed = 50  # km/h
-        time_min = (dist / avg_speed) * 60 + order['Traffic_Delay_Minutes']
-        congestion = self.traffic[self.traffic['Order_ID'] == order['Order_ID']]['congestion'].values[0]
-        time_min *= (1 + congestion)
-
-        fuel_cost_per_km = 1 / vehicle['Fuel_Efficiency_KM_per_L'] * 100  # Assume ₹100/L
-        cost = dist * fuel_cost_per_km
-
-        if 'Truck' in vehicle['Vehicle_Type']: cost *= 1.2
-        elif 'Van' in vehicle['Vehicle_Type']: cost *= 1.0
-        elif 'Bike' in vehicle['Vehicle_Type']: cost *= 0.8
-        elif 'Refrigerated' in vehicle['Vehicle_Type']: cost *= 1.5
-
-        priority_multiplier = {'Express': 1.5, 'Standard': 1.2, 'Economy': 1.0}
-        cost *= priority_multiplier.get(order['Priority'], 1)
-
-        return cost, time_min
-
-    def optimize(self):
-        solver = pywraplp.Solver.CreateSolver('SCIP')
-        x = {}
-        for i, order in self.orders.iterrows():
-            for j, vehicle in self.vehicles.iterrows():
-                if self.is_compatible(order, vehicle):
-                    x[i, j] = solver.BoolVar(f'x_{i}_{j}')
-
-        # Minimize Cost
-        solver.Minimize(solver.Sum(self.compute_cost(self.orders.iloc[i], self.vehicles.iloc[j])[0] * x[i, j]
-                                   for i in range(len(self.orders)) for j in range(len(self.vehicles)) if (i, j) in x))
-
-        # Constraints
-        for i in range(len(self.orders)):
-            solver.Add(solver.Sum(x[i, j] for j in range(len(self.vehicles)) if (i, j) in x) <= 1)  # Optional assignment for demo
-        for j in range(len(self.vehicles)):
-            solver.Add(solver.Sum(x[i, j] for i in range(len(self.orders)) if (i, j) in x) <= 1)
-
-        status = solver.Solve()
-        assignments = []
-        total_cost = 0
-        total_co2 = 0
-        if status == pywraplp.Solver.OPTIMAL:
-            for i in range(len(self.orders)):
-                for j in range(len(self.vehicles)):
-                    if (i, j) in x and x[i, j].solution_value() > 0.5:
-                        order = self.orders.iloc[i]
-                        vehicle = self.vehicles.iloc[j]
-                        cost, time = self.compute_cost(order, vehicle)
-                        co2 = order['Distance_KM'] * vehicle['CO2_Emissions_Kg_per_KM']
-                        assignments.append({
-                            'order_id': order['Order_ID'], 'vehicle_id': vehicle['Vehicle_ID'], 'vehicle_type': vehicle['Vehicle_Type'],
-                            'priority': order['Priority'], 'distance_km': order['Distance_KM'], 'est_time_min': round(time),
-                            'cost_inr': round(cost), 'from': order['Origin'], 'to': order['Destination'], 'co2_kg': round(co2)
-                        })
-                        total_cost += cost
-                        total_co2 += co2
-
-        metrics = {
-            'cost_saving': 150000 - total_cost, 'fuel_saved': total_cost / 100,  # Assume ₹100/L
-            'co2_saved': total_co2 * 0.8,  # 20% reduction vs manual
-            'ontime_improve': 5.0
-        }
-        return pd.DataFrame(assignments), metrics
-
-    def is_compatible(self, order, vehicle):
-        if order['weight_kg'] > vehicle['Capacity_KG']: return False
-        if order['Special_Handling'] == 'Temperature_Controlled' and 'Refrigerated' not in vehicle['Vehicle_Type']: return False
-        # Add more: e.g., Hazmat if needed
-        return True
\ No newline at end of file
+# optimizer.py
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.graph.python import min_cost_flow
+from ortools.linear_solver import pywraplp
+import numpy as np
+import pandas as pd
+
+AVG_SPEED_KMH = 50
+FUEL_PRICE_INR = 100  # Assume ₹100/L
+# Checked in order, first substring match wins
+VEHICLE_TYPE_MULTIPLIERS = [('Truck', 1.2), ('Van', 1.0), ('Bike', 0.8), ('Refrigerated', 1.5)]
+PRIORITY_MULTIPLIERS = {'Express': 1.5, 'Standard': 1.2, 'Economy': 1.0}
+BATCH_TIME_LIMIT_S = 2.0
+
+
+def vehicle_type_multiplier(vehicle_types):
+    vehicle_types = pd.Series(vehicle_types, dtype=object).astype(str)
+    conditions = [vehicle_types.str.contains(name, regex=False).to_numpy() for name, _ in VEHICLE_TYPE_MULTIPLIERS]
+    return np.select(conditions, [mult for _, mult in VEHICLE_TYPE_MULTIPLIERS], default=1.0)
+
+
+def group_pairs(keys):
+    # Positions of the COO entries sharing each distinct key, e.g. all pairs of one order
+    order = np.argsort(keys, kind='stable')
+    return np.split(order, np.flatnonzero(np.diff(keys[order])) + 1) if len(keys) else []
+
+
+class CityDistanceMatrix:
+    # City x city road distances from routes_distance.csv ('Route' is 'Origin-Destination'), held as a
+    # dense float32 array indexed by integer city codes so lookups are plain array indexing
+    def __init__(self, routes):
+        ends = routes['Route'].str.split('-', n=1, expand=True)
+        self.cities = pd.Index(pd.unique(ends.to_numpy().ravel())).dropna().sort_values()
+        origin = self.cities.get_indexer(ends[0])
+        destination = self.cities.get_indexer(ends[1])
+        dist = routes['Distance_KM'].to_numpy(dtype=float)
+        known = (origin >= 0) & (destination >= 0) & np.isfinite(dist)
+        n = len(self.cities)
+        # Average observed distance per directed city pair, usable in either direction
+        flat = origin[known] * n + destination[known]
+        total = np.bincount(flat, weights=dist[known], minlength=n * n)
+        count = np.bincount(flat, minlength=n * n)
+        km = np.where(count > 0, total / np.maximum(count, 1), np.inf).reshape(n, n)
+        km = np.minimum(km, km.T)
+        np.fill_diagonal(km, 0)
+        # Floyd-Warshall fills pairs never routed directly with the shortest chain of known legs
+        for k in range(n):
+            km = np.minimum(km, km[:, k, None] + km[None, k, :])
+        self.distance_km = km.astype(np.float32)
+        self.time_min = (km / AVG_SPEED_KMH * 60).astype(np.float32)
+
+    @classmethod
+    def from_csv(cls, path='data/routes_distance.csv'):
+        return cls(pd.read_csv(path, usecols=['Route', 'Distance_KM']))
+
+    def codes(self, cities):
+        # -1 for cities never seen in routes_distance.csv
+        return self.cities.get_indexer(cities)
+
+    def lookup(self, from_codes, to_codes):
+        # Broadcasting gather; unknown cities get 0 km since there is nothing to price them with
+        from_codes, to_codes = np.asarray(from_codes), np.asarray(to_codes)
+        km = self.distance_km[from_codes, to_codes].astype(float)
+        return np.where((from_codes < 0) | (to_codes < 0), 0.0, km)
+
+
+def solve_region(orders, vehicles, traffic, assignment, options, city_distances=None):
+    # Worker for optimize_partitioned; module level so it pickles into the process pool
+    optimizer = DynamicFleetOptimizer(orders, vehicles, None, traffic, city_distances)
+    optimizer.assignment = assignment
+    optimizer.optimize(**options)
+    return optimizer.assignment
+
+
+class DynamicFleetOptimizer:
+    def __init__(self, orders, vehicles, historical, traffic, city_distances=None):
+        self.orders = orders
+        self.fleet = vehicles
+        self.vehicles = vehicles[vehicles['Status'] == 'Available']
+        self.historical = historical
+        self.traffic = traffic
+        # Optional CityDistanceMatrix; adds the deadhead leg from Current_Location to the order's Origin
+        self.city_distances = city_distances
+        # Order_ID -> congestion, first row wins like the old boolean scan
+        self.congestion = traffic.drop_duplicates('Order_ID').set_index('Order_ID')['congestion']
+        self.cost_matrix, self.time_matrix, self.compatible = self.price(self.orders, self.vehicles)
+        self.refresh_pairs()
+        # Extra MIP rows, each called as builder(solver, x, rows, cols)
+        self.side_constraints = []
+        # Order_ID -> Vehicle_ID from the last optimize() call, used to warm-start the next one
+        self.assignment = {}
+
+    def order_arrays(self, orders):
+        dist = orders['Distance_KM'].to_numpy(dtype=float)
+        congestion = self.congestion.reindex(orders['Order_ID']).fillna(0).to_numpy(dtype=float)
+        time_min = (dist / AVG_SPEED_KMH * 60 + orders['Traffic_Delay_Minutes'].to_numpy(dtype=float)) * (1 + congestion)
+        priority = orders['Priority'].map(PRIORITY_MULTIPLIERS).fillna(1).to_numpy(dtype=float)
+        return dist, time_min, priority
+
+    def vehicle_arrays(self, vehicles):
+        fuel_cost_per_km = FUEL_PRICE_INR / vehicles['Fuel_Efficiency_KM_per_L'].to_numpy(dtype=float)
+        return fuel_cost_per_km * vehicle_type_multiplier(vehicles['Vehicle_Type'])
+
+    def build_matrices(self, orders, vehicles):
+        # cost[i, j] = dist_i * priority_i * fuel_cost_per_km_j * type_j; time only depends on the order
+        dist, time_min, priority = self.order_arrays(orders)
+        vehicle_cost_per_km = self.vehicle_arrays(vehicles)
+        cost = np.outer(dist * priority, vehicle_cost_per_km)
+        time_matrix = np.broadcast_to(time_min[:, None], cost.shape)
+        if self.city_distances is not None:
+            # Empty run to pickup: priced at the vehicle's own per-km rate, no priority markup
+            deadhead_km = self.city_distances.lookup(self.city_distances.codes(vehicles['Current_Location'])[None, :],
+                                                     self.city_distances.codes(orders['Origin'])[:, None])
+            cost = cost + deadhead_km * vehicle_cost_per_km[None, :]
+            time_matrix = time_matrix + deadhead_km / AVG_SPEED_KMH * 60
+        return cost, time_matrix
+
+    def price(self, orders, vehicles):
+        # Unpriced orders (no Distance_KM) are never compatible
+        cost, time_matrix = self.build_matrices(orders, vehicles)
+        return cost, np.ascontiguousarray(time_matrix), self.compatibility_mask(orders, vehicles) & np.isfinite(cost)
+
+    def refresh_pairs(self):
+        # Feasible (order, vehicle) pairs as a COO index, sorted by order
+        self.pairs = np.nonzero(self.compatible)
+
+    def compute_cost(self, order, vehicle):
+        cost, time_min = self.build_matrices(order.to_frame().T, vehicle.to_frame().T)
+        return cost[0, 0], time_min[0, 0]
+
+    def add_constraint(self, builder):
+        self.side_constraints.append(builder)
+
+    # Incremental updates: only the new rows/columns of the matrices are priced
+
+    def add_orders(self, orders, traffic=None):
+        if traffic is not None:
+            self.traffic = pd.concat([self.traffic, traffic], ignore_index=True)
+            new = traffic.drop_duplicates('Order_ID', keep='last').set_index('Order_ID')['congestion']
+            self.congestion = pd.concat([self.congestion[~self.congestion.index.isin(new.index)], new])
+        # Upsert: a re-sent order replaces its earlier row (and matrix rows) rather than duplicating it
+        orders = orders.drop_duplicates('Order_ID', keep='last')
+        keep = ~self.orders['Order_ID'].isin(orders['Order_ID']).to_numpy()
+        cost, time_matrix, compatible = self.price(orders, self.vehicles)
+        self.orders = pd.concat([self.orders[keep], orders])
+        self.cost_matrix = np.vstack([self.cost_matrix[keep], cost])
+        self.time_matrix = np.vstack([self.time_matrix[keep], time_matrix])
+        self.compatible = np.vstack([self.compatible[keep], compatible])
+        self.refresh_pairs()
+
+    def remove_orders(self, order_ids):
+        keep = ~self.orders['Order_ID'].isin(order_ids).to_numpy()
+        self.orders = self.orders[keep]
+        self.cost_matrix = self.cost_matrix[keep]
+        self.time_matrix = self.time_matrix[keep]
+        self.compatible = self.compatible[keep]
+        self.refresh_pairs()
+
+    def add_vehicles(self, vehicles):
+        self.fleet = pd.concat([self.fleet[~self.fleet['Vehicle_ID'].isin(vehicles['Vehicle_ID'])], vehicles])
+        vehicles = vehicles[(vehicles['Status'] == 'Available') & ~vehicles['Vehicle_ID'].isin(self.vehicles['Vehicle_ID'])]
+        cost, time_matrix, compatible = self.price(self.orders, vehicles)
+        self.vehicles = pd.concat([self.vehicles, vehicles])
+        self.cost_matrix = np.hstack([self.cost_matrix, cost])
+        self.time_matrix = np.hstack([self.time_matrix, time_matrix])
+        self.compatible = np.hstack([self.compatible, compatible])
+        self.refresh_pairs()
+
+    def remove_vehicles(self, vehicle_ids):
+        keep = ~self.vehicles['Vehicle_ID'].isin(vehicle_ids).to_numpy()
+        self.vehicles = self.vehicles[keep]
+        self.cost_matrix = self.cost_matrix[:, keep]
+        self.time_matrix = self.time_matrix[:, keep]
+        self.compatible = self.compatible[:, keep]
+        self.refresh_pairs()
+
+    def set_vehicle_status(self, vehicle_id, status):
+        # e.g. a vehicle flipping from In_Transit to Available joins the pool
+        vehicle = self.fleet[self.fleet['Vehicle_ID'] == vehicle_id].assign(Status=status)
+        if status == 'Available':
+            self.add_vehicles(vehicle)
+        else:
+            self.fleet = pd.concat([self.fleet[self.fleet['Vehicle_ID'] != vehicle_id], vehicle])
+            self.remove_vehicles([vehicle_id])
+
+    def warm_start(self, one_per_vehicle):
+        # Previous assignment as (rows, cols) positions, dropping orders/vehicles that left or became incompatible
+        if not self.assignment:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        rows = pd.Index(self.orders['Order_ID']).get_indexer(list(self.assignment))
+        cols = pd.Index(self.vehicles['Vehicle_ID']).get_indexer(list(self.assignment.values()))
+        valid = np.flatnonzero((rows >= 0) & (cols >= 0))
+        rows, cols = rows[valid], cols[valid]
+        valid = self.compatible[rows, cols]
+        rows, cols = rows[valid], cols[valid]
+        if one_per_vehicle:
+            _, first = np.unique(cols, return_index=True)
+            rows, cols = rows[np.sort(first)], cols[np.sort(first)]
+        return rows, cols
+
+    def optimize(self, backend='auto', mode='single', time_limit=None, warm_start=True):
+        # mode='single': at most one order per vehicle, solved exactly by `backend`
+        # mode='batch': many orders per vehicle up to Capacity_KG, solved heuristically within time_limit
+        # time_limit (seconds) caps the MIP and batch search; the best feasible solution found is returned
+        if mode not in ('single', 'batch'):
+            raise ValueError(f"Unknown mode '{mode}', expected 'single' or 'batch'")
+        hint = self.warm_start(one_per_vehicle=mode == 'single') if warm_start else None
+        if mode == 'batch':
+            if self.side_constraints:
+                raise ValueError("Side constraints are not supported with mode='batch'")
+            if backend != 'auto':
+                raise ValueError(f"backend='{backend}' only applies to mode='single'")
+            rows, cols, status = self.solve_batch(BATCH_TIME_LIMIT_S if time_limit is None else time_limit, hint)
+        else:
+            # 'auto' uses the polynomial-time assignment solver unless side constraints need the MIP
+            if backend == 'auto':
+                backend = 'mip' if self.side_constraints else 'assignment'
+            if backend not in ('mip', 'assignment'):
+                raise ValueError(f"Unknown backend '{backend}', expected 'auto', 'mip' or 'assignment'")
+            if backend == 'assignment' and self.side_constraints:
+                raise ValueError("Side constraints require backend='mip'")
+            rows, cols, status = self.solve_mip(time_limit, hint) if backend == 'mip' else self.solve_assignment()
+        self.assignment = dict(zip(self.orders['Order_ID'].to_numpy()[rows], self.vehicles['Vehicle_ID'].to_numpy()[cols]))
+        assignments, metrics = self.assignment_result(rows, cols)
+        metrics['status'] = status
+        return assignments, metrics
+
+    def assignment_reward(self):
+        # Larger than any cost difference between matchings, so the MIP assigns as many orders
+        # as possible and then minimizes cost -- the same optimum the min-cost max-flow finds
+        rows, cols = self.pairs
+        if not len(rows):
+            return 0.0
+        return float(self.cost_matrix[rows, cols].max()) * min(len(np.unique(rows)), len(np.unique(cols))) + 1
+
+    def optimize_partitioned(self, regions=None, max_workers=None, **options):
+        # Solve each region (orders by Origin, vehicles by Current_Location) in its own process, then
+        # give leftover orders one global pass over the unused capacity. regions maps city -> region;
+        # cities it doesn't list stay their own region. options are passed through to optimize().
+        if self.side_constraints:
+            raise ValueError('Side constraints are not supported with optimize_partitioned')
+        regions = regions or {}
+        order_region = self.orders['Origin'].map(lambda city: regions.get(city, city)).to_numpy()
+        vehicle_region = self.vehicles['Current_Location'].map(lambda city: regions.get(city, city)).to_numpy()
+        jobs = []
+        for region in np.intersect1d(pd.unique(order_region), pd.unique(vehicle_region)):
+            orders = self.orders[order_region == region]
+            order_ids = set(orders['Order_ID'])
+            assignment = {k: v for k, v in self.assignment.items() if k in order_ids}
+            jobs.append((orders, self.vehicles[vehicle_region == region], self.traffic_for(orders), assignment, options,
+                         self.city_distances))
+
+        assignment = {}
+        if len(jobs) > 1 and max_workers != 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                for result in pool.map(solve_region, *zip(*jobs)):
+                    assignment.update(result)
+        else:
+            for job in jobs:
+                assignment.update(solve_region(*job))
+
+        # Reconcile: one global pass for unassigned orders over what is left of the fleet
+        leftover = self.orders[~self.orders['Order_ID'].isin(list(assignment))]
+        weight = pd.Series(np.nan_to_num(self.orders['weight_kg'].to_numpy(dtype=float)), index=self.orders['Order_ID'].to_numpy())
+        used = weight.reindex(list(assignment)).groupby(pd.Series(list(assignment.values()), dtype=object).to_numpy()).sum()
+        if options.get('mode', 'single') == 'batch':
+            vehicles = self.vehicles.assign(Capacity_KG=self.vehicles['Capacity_KG'] - used.reindex(self.vehicles['Vehicle_ID']).fillna(0).to_numpy())
+        else:
+            vehicles = self.vehicles[~self.vehicles['Vehicle_ID'].isin(used.index)]
+        if len(leftover) and len(vehicles):
+            assignment.update(solve_region(leftover, vehicles, self.traffic_for(leftover), {}, options, self.city_distances))
+
+        rows = pd.Index(self.orders['Order_ID']).get_indexer(list(assignment))
+        cols = pd.Index(self.vehicles['Vehicle_ID']).get_indexer(list(assignment.values()))
+        self.assignment = assignment
+        assignments, metrics = self.assignment_result(rows, cols)
+        metrics['status'] = 'feasible'  # each region is solved to its own optimum, not the global one
+        return assignments, metrics
+
+    def traffic_for(self, orders):
+        congestion = self.congestion[self.congestion.index.isin(orders['Order_ID'])]
+        return congestion.rename_axis('Order_ID').reset_index()
+
+    def solve_mip(self, time_limit=None, hint=None):
+        solver = pywraplp.Solver.CreateSolver('SCIP')
+        if time_limit is not None:
+            solver.SetTimeLimit(int(time_limit * 1000))
+        rows, cols = self.pairs
+        x = [solver.BoolVar(f'x_{i}_{j}') for i, j in zip(rows, cols)]
+        hinted = np.zeros(len(rows), dtype=bool)
+        if hint is not None and len(hint[0]):
+            n_vehicles = self.compatible.shape[1]
+            hinted = np.isin(rows * n_vehicles + cols, hint[0] * n_vehicles + hint[1])
+            solver.SetHint(x, hinted.astype(float).tolist())
+
+        # Minimize Cost
+        reward = self.assignment_reward()
+        objective = solver.Objective()
+        for var, cost in zip(x, self.cost_matrix[rows, cols]):
+            objective.SetCoefficient(var, float(cost) - reward)
+        objective.SetMinimization()
+
+        # Constraints: one per order and per vehicle that has any feasible pair
+        for group in group_pairs(rows) + group_pairs(cols):
+            constraint = solver.Constraint(-solver.infinity(), 1)
+            for k in group:
+                constraint.SetCoefficient(x[k], 1)
+        base_constraints = solver.NumConstraints()
+        for builder in self.side_constraints:
+            builder(solver, x, rows, cols)
+
+        status = solver.Solve()
+        if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+            chosen = [k for k, var in enumerate(x) if var.solution_value() > 0.5]
+            return rows[chosen], cols[chosen], 'optimal' if status == pywraplp.Solver.OPTIMAL else 'feasible'
+        if status == pywraplp.Solver.NOT_SOLVED and hinted.any() \
+                and self.satisfies(solver.constraints()[base_constraints:], [x[k] for k in np.flatnonzero(hinted)]):
+            # Out of time before SCIP found anything: the warm start is still a valid plan
+            return rows[hinted], cols[hinted], 'warm_start'
+        return rows[:0], cols[:0], 'infeasible' if status == pywraplp.Solver.INFEASIBLE else 'not_solved'
+
+    @staticmethod
+    def satisfies(constraints, chosen, tolerance=1e-6):
+        # Whether setting the `chosen` variables to 1 (and all others to 0) meets every constraint
+        for constraint in constraints:
+            activity = sum(constraint.GetCoefficient(var) for var in chosen)
+            if not constraint.lb() - tolerance <= activity <= constraint.ub() + tolerance:
+                return False
+        return True
+
+    def solve_assignment(self):
+        # Bipartite min-cost max-flow: source -> order -> vehicle -> sink, unit capacities
+        rows, cols = self.pairs
+        if not len(rows):
+            return rows, cols, 'optimal'
+        n_orders, n_vehicles = len(self.orders), len(self.vehicles)
+        source, sink = n_orders + n_vehicles, n_orders + n_vehicles + 1
+        order_nodes = np.unique(rows)
+        vehicle_nodes = np.unique(cols) + n_orders
+        # Pair arcs go first so arc k is pair k
+        tails = np.concatenate([rows, np.full(len(order_nodes), source), vehicle_nodes])
+        heads = np.concatenate([cols + n_orders, order_nodes, np.full(len(vehicle_nodes), sink)])
+        costs = np.zeros(len(tails), dtype=np.int64)
+        costs[:len(rows)] = np.round(self.cost_matrix[rows, cols] * 100)  # integer paise
+
+        flow = min_cost_flow.SimpleMinCostFlow()
+        flow.add_arcs_with_capacity_and_unit_cost(tails, heads, np.ones(len(tails), dtype=np.int64), costs)
+        supply = min(len(order_nodes), len(vehicle_nodes))
+        flow.set_node_supply(source, supply)
+        flow.set_node_supply(sink, -supply)
+        if flow.solve_max_flow_with_min_cost() != flow.OPTIMAL:
+            return rows[:0], cols[:0], 'not_solved'
+        chosen = flow.flows(np.arange(len(rows))) > 0
+        return rows[chosen], cols[chosen], 'optimal'
+
+    def solve_batch(self, time_limit, hint=None):
+        deadline = time.monotonic() + time_limit
+        # Each order's compatible vehicles, cheapest first (ties by vehicle position): a row-wise sort
+        # of the cost matrix, far cheaper than sorting the pair list
+        by_cost = np.argsort(np.where(self.compatible, self.cost_matrix, np.inf), axis=1, kind='stable')
+        counts = self.compatible.sum(axis=1)
+        cols = by_cost[np.arange(by_cost.shape[1])[None, :] < counts[:, None]]
+        starts = np.concatenate([[0], np.cumsum(counts)])
+        weight = np.nan_to_num(self.orders['weight_kg'].to_numpy(dtype=float))
+        room = self.vehicles['Capacity_KG'].to_numpy(dtype=float).copy()
+        vehicle_of = np.full(len(self.orders), -1)
+
+        def move(i, j):
+            if vehicle_of[i] >= 0:
+                room[vehicle_of[i]] += weight[i]
+            vehicle_of[i] = j
+            room[j] -= weight[i]
+
+        # Keep the previous plan where it still fits, then first-fit decreasing for the rest:
+        # heaviest orders first, into the cheapest vehicle that still has room. The time limit covers
+        # this pass too: orders it doesn't reach before the deadline are left unassigned.
+        if hint is not None:
+            for i, j in zip(*hint):
+                if room[j] >= weight[i]:
+                    move(i, j)
+        for i in np.argsort(-weight, kind='stable'):
+            if time.monotonic() >= deadline:
+                break
+            if vehicle_of[i] >= 0:
+                continue
+            candidates = cols[starts[i]:starts[i + 1]]
+            fits = np.flatnonzero(room[candidates] >= weight[i])
+            if len(fits):
+                move(i, candidates[fits[0]])
+
+        # Local search until no move improves or the time budget runs out
+        improved = True
+        while improved and time.monotonic() < deadline:
+            improved = False
+            for i in range(len(self.orders)):
+                if time.monotonic() >= deadline:
+                    break
+                candidates = cols[starts[i]:starts[i + 1]]
+                current = vehicle_of[i]
+                if current >= 0:
+                    # Only vehicles cheaper than the current one are listed before it
+                    candidates = candidates[:np.flatnonzero(candidates == current)[0]]
+                if not len(candidates):
+                    continue
+                # Relocate: insert an unassigned order, or move to a cheaper vehicle with room
+                fits = np.flatnonzero(room[candidates] >= weight[i])
+                if len(fits):
+                    move(i, candidates[fits[0]])
+                    improved = True
+                    continue
+                if current < 0:
+                    continue
+                # Swap: trade places with an order on a cheaper vehicle when both fit and total cost drops
+                for j in candidates:
+                    others = np.flatnonzero(vehicle_of == j)
+                    others = others[self.compatible[others, current]
+                                    & (weight[others] <= room[current] + weight[i])
+                                    & (weight[i] <= room[j] + weight[others])]
+                    gain = (self.cost_matrix[i, current] + self.cost_matrix[others, j]
+                            - self.cost_matrix[i, j] - self.cost_matrix[others, current])
+                    if len(others) and gain.max() > 1e-9:
+                        k = others[np.argmax(gain)]
+                        room[current] += weight[i] - weight[k]
+                        room[j] += weight[k] - weight[i]
+                        vehicle_of[i], vehicle_of[k] = j, current
+                        improved = True
+                        break
+
+        assigned = np.flatnonzero(vehicle_of >= 0)
+        return assigned, vehicle_of[assigned], 'feasible'
+
+    def assignment_result(self, rows, cols):
+        orders = self.orders.iloc[rows]
+        vehicles = self.vehicles.iloc[cols]
+        cost = self.cost_matrix[rows, cols]
+        time_min = self.time_matrix[rows, cols]
+        co2 = orders['Distance_KM'].to_numpy(dtype=float) * vehicles['CO2_Emissions_Kg_per_KM'].to_numpy(dtype=float)
+        assignments = pd.DataFrame({
+            'order_id': orders['Order_ID'].to_numpy(), 'vehicle_id': vehicles['Vehicle_ID'].to_numpy(),
+            'vehicle_type': vehicles['Vehicle_Type'].to_numpy(), 'priority': orders['Priority'].to_numpy(),
+            'distance_km': orders['Distance_KM'].to_numpy(), 'est_time_min': np.round(time_min).astype(int),
+            'cost_inr': np.round(cost).astype(int), 'from': orders['Origin'].to_numpy(), 'to': orders['Destination'].to_numpy(),
+            'co2_kg': np.round(co2).astype(int)
+        })
+        total_cost = float(cost.sum())
+        total_co2 = float(co2.sum())
+
+        metrics = {
+            'cost_saving': 150000 - total_cost, 'fuel_saved': total_cost / FUEL_PRICE_INR,
+            'co2_saved': total_co2 * 0.8,  # 20% reduction vs manual
+            'ontime_improve': 5.0
+        }
+        return assignments, metrics
+
+    def compatibility_mask(self, orders, vehicles):
+        weight = orders['weight_kg'].to_numpy(dtype=float)
+        capacity = vehicles['Capacity_KG'].to_numpy(dtype=float)
+        needs_cold = (orders['Special_Handling'] == 'Temperature_Controlled').to_numpy()
+        refrigerated = vehicles['Vehicle_Type'].astype(str).str.contains('Refrigerated', regex=False).to_numpy()
+        overweight = weight[:, None] > capacity[None, :]
+        # Add more: e.g., Hazmat if needed
+        return ~overweight & ~(needs_cold[:, None] & ~refrigerated[None, :])
+
+    def is_compatible(self, order, vehicle):
+        return bool(self.compatibility_mask(order.to_frame().T, vehicle.to_frame().T)[0, 0])
@@ -0,0 +1,66 @@
+# order_index.py
+import numpy as np
+import pandas as pd
+
+# Columns the dashboard filters on by value
+FILTER_COLUMNS = ['Priority', 'Product_Category', 'Origin']
+
+
+class OrderIndex:
+    # Positional index over the orders frame from data_store.load_tables, which is sorted by
+    # Order_Date day with undated orders last (rows within a day keep their CSV order)
+    def __init__(self, orders):
+        dates = orders['Order_Date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+        self.dated = int(np.count_nonzero(~np.isnat(dates)))
+        self.dates = dates[:self.dated]
+        if np.isnat(self.dates).any() or (self.dates[1:] < self.dates[:-1]).any():
+            raise ValueError('orders must be sorted by Order_Date day with undated orders last')
+        self.latest = pd.Timestamp(self.dates[-1]).normalize() if self.dated else None
+
+    def window(self, days):
+        # Orders from the last `days` days up to the latest order date (the data is historical, so the
+        # window is anchored there rather than at today). Returns the rows as a contiguous slice found
+        # by binary search, and the window's first and last day.
+        if days < 1:
+            raise ValueError(f'Time range must be at least 1 day, got {days}')
+        if self.latest is None:
+            return slice(0, 0), None, None
+        start = self.latest - pd.Timedelta(days=days - 1)
+        first = int(np.searchsorted(self.dates, start.to_datetime64().astype('datetime64[D]'), side='left'))
+        return slice(first, self.dated), start, self.latest
+
+    def newest_first(self, rows):
+        # Ascending row positions reordered newest order first, undated orders last
+        rows = np.asarray(rows)
+        split = int(np.searchsorted(rows, self.dated))
+        return np.concatenate([rows[:split][::-1], rows[split:]])
+
+
+class BitmapIndex:
+    # One packed bitmap per value of each filter column (np.packbits, one bit per orders row), so a
+    # filter is resolved with bitwise ops instead of comparing every row
+    def __init__(self, orders, columns=FILTER_COLUMNS):
+        self.rows = len(orders)
+        self.bitmaps = {}
+        for column in columns:
+            codes, values = pd.factorize(orders[column])
+            self.bitmaps[column] = {value: np.packbits(codes == code) for code, value in enumerate(values)}
+
+    def select(self, filters, rows=None):
+        # filters: {column: selected values}; values are ORed within a column and columns ANDed.
+        # rows: an optional contiguous slice (e.g. an OrderIndex window); only the bitmap bytes
+        # covering it are combined. Returns matching row positions in ascending order.
+        unknown = set(filters) - set(self.bitmaps)
+        if unknown:
+            raise ValueError(f'No bitmap index for {sorted(unknown)}, indexed columns are {list(self.bitmaps)}')
+        start, stop = (0, self.rows) if rows is None else (rows.start, rows.stop)
+        first, last = start // 8, -(-stop // 8)
+        result = np.full(last - first, 0xFF, dtype=np.uint8)
+        for column, values in filters.items():
+            matched = np.zeros(last - first, dtype=np.uint8)
+            for value in values:
+                if value in self.bitmaps[column]:
+                    matched |= self.bitmaps[column][value][first:last]
+            result &= matched
+        positions = np.flatnonzero(np.unpackbits(result)) + first * 8
+        return positions[(positions >= start) & (positions < stop)]
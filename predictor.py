@@ -1,21 +1,122 @@
-# predictor.py
-from sklearn.ensemble import RandomForestRegressor
-import pandas as pd
-
-class DelayPredictor:
-    def __init__(self, historical):
-        self.model = RandomForestRegressor(n_estimators=100)
-        X = historical[['Distance_KM', 'weight_kg', 'traffic_index', 'hour', 'is_rain', 'priority_encoded']].fillna(0)
-        y = historical['delay_min'].clip(0).fillna(0)
-        self.model.fit(X, y)
-        self.priority_map = {'Economy': 0, 'Standard': 1, 'Express': 2}
-
-    def predict_batch(self, orders):
-        X = orders.copy()
-        X['hour'] = X['Order_Date'].dt.hour
-        X['priority_encoded'] = X['Priority'].map(self.priority_map)
-        X['traffic_index'] = X['Traffic_Delay_Minutes'] / (X['Distance_KM'] / 50 * 60)
-        X['is_rain'] = X['Weather_Impact'].str.contains('Rain', na=False).astype(int)
-        X['delay_risk_score'] = self.model.predict(X[['Distance_KM', 'weight_kg', 'traffic_index', 'hour', 'is_rain', 'priority_encoded']].fillna(0))
-        X['delay_risk_score'] = (X['delay_risk_score'] - X['delay_risk_score'].min()) / (X['delay_risk_score'].max() - X['delay_risk_score'].min() + 1e-6) * 100
-        return X
\ No newline at end of file
+# predictor.py
+import hashlib
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+FEATURES = ['Distance_KM', 'weight_kg', 'traffic_index', 'hour', 'is_rain', 'priority_encoded']
+# Raw order columns the features are derived from
+INPUT_COLUMNS = ['Order_ID', 'Order_Date', 'Priority', 'Distance_KM', 'weight_kg', 'Traffic_Delay_Minutes', 'Weather_Impact']
+STREAM_CHUNK_ROWS = 100_000
+N_ESTIMATORS = 100
+MODEL_PATH = 'models/delay_predictor.joblib'
+PARALLEL_BATCH_ROWS = 10_000  # below this, thread start-up costs more than it saves
+SCORE_LEVELS = np.linspace(0, 100, 101)
+
+
+class DelayPredictor:
+    def __init__(self, historical, model_path=None):
+        # With model_path, a saved model is reused as long as the features and training data are
+        # unchanged; otherwise it is retrained and saved there
+        X = historical[FEATURES].fillna(0).astype(np.float32)
+        y = historical['delay_min'].clip(0).fillna(0)
+        self.priority_map = {'Economy': 0, 'Standard': 1, 'Express': 2}
+        self.data_hash = self.fingerprint(X, y)
+        self.model, self.score_quantiles = self.load(model_path) if model_path else (None, None)
+        if self.model is None:
+            self.model = RandomForestRegressor(n_estimators=N_ESTIMATORS, n_jobs=-1, oob_score=True)
+            self.model.fit(X.to_numpy(), y)
+            # Percentiles of out-of-bag predictions, i.e. how the model scores orders it hasn't seen
+            self.score_quantiles = np.nanquantile(self.model.oob_prediction_, SCORE_LEVELS / 100)
+            if model_path:
+                self.save(model_path)
+
+    @staticmethod
+    def fingerprint(X, y):
+        rows = pd.util.hash_pandas_object(X.assign(delay_min=y), index=False).to_numpy()
+        return hashlib.sha256(rows.tobytes()).hexdigest()
+
+    def load(self, model_path):
+        if not os.path.exists(model_path):
+            return None, None
+        # A plain load: sklearn copies each tree's arrays on unpickling, so mmap_mode wouldn't share them
+        saved = joblib.load(model_path)
+        if (saved['features'] != FEATURES or saved['n_estimators'] != N_ESTIMATORS
+                or saved['data_hash'] != self.data_hash or 'score_quantiles' not in saved):
+            return None, None
+        return saved['model'], saved['score_quantiles']
+
+    def save(self, model_path):
+        os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+        tmp_path = f'{model_path}.tmp'
+        # Uncompressed: loads faster than a compressed dump, and the file is rewritten only on retrain
+        joblib.dump({'model': self.model, 'features': FEATURES, 'n_estimators': N_ESTIMATORS,
+                     'data_hash': self.data_hash, 'score_quantiles': self.score_quantiles}, tmp_path)
+        os.replace(tmp_path, model_path)
+
+    def risk_score(self, predicted_delay):
+        # Percentile of the training-time score distribution: stable per order, whatever the batch.
+        # A value equal to several quantiles (tied training scores, e.g. many zero delays) gets the
+        # middle of their levels rather than the top.
+        predicted = np.asarray(predicted_delay, dtype=float)
+        scores = np.interp(predicted, self.score_quantiles, SCORE_LEVELS)
+        left = np.searchsorted(self.score_quantiles, predicted, side='left')
+        right = np.searchsorted(self.score_quantiles, predicted, side='right')
+        last = len(SCORE_LEVELS) - 1
+        tied_mid = (SCORE_LEVELS[np.minimum(left, last)] + SCORE_LEVELS[np.clip(right - 1, 0, last)]) / 2
+        return np.where(right - left > 1, tied_mid, scores)
+
+    def predict_batch(self, orders, scoring='batch'):
+        # scoring='batch': min-max over this batch (scores are relative to the other orders in it)
+        # scoring='quantile': fixed training quantiles, so chunks or shards can be scored independently
+        if scoring not in ('batch', 'quantile'):
+            raise ValueError(f"Unknown scoring '{scoring}', expected 'batch' or 'quantile'")
+        X = orders.copy()
+        X['hour'] = X['Order_Date'].dt.hour
+        X['priority_encoded'] = X['Priority'].map(self.priority_map)
+        X['traffic_index'] = X['Traffic_Delay_Minutes'] / (X['Distance_KM'] / 50 * 60)
+        X['is_rain'] = X['Weather_Impact'].str.contains('Rain', na=False).astype(int)
+        self.model.n_jobs = -1 if len(X) >= PARALLEL_BATCH_ROWS else None
+        X['delay_risk_score'] = self.model.predict(X[FEATURES].fillna(0).to_numpy(dtype=np.float32))
+        if scoring == 'quantile':
+            X['delay_risk_score'] = self.risk_score(X['delay_risk_score'].to_numpy())
+        else:
+            X['delay_risk_score'] = (X['delay_risk_score'] - X['delay_risk_score'].min()) / (X['delay_risk_score'].max() - X['delay_risk_score'].min() + 1e-6) * 100
+        return X
+
+    def feature_matrix(self, orders):
+        # Same features as predict_batch, written straight into a float32 array instead of a frame copy
+        X = np.empty((len(orders), len(FEATURES)), dtype=np.float32)
+        X[:, 0] = orders['Distance_KM'].to_numpy(dtype=float)
+        X[:, 1] = orders['weight_kg'].to_numpy(dtype=float)
+        X[:, 2] = orders['Traffic_Delay_Minutes'].to_numpy(dtype=float) / (X[:, 0] / 50 * 60)
+        X[:, 3] = pd.to_datetime(orders['Order_Date']).dt.hour.to_numpy(dtype=float)
+        X[:, 4] = orders['Weather_Impact'].astype(str).str.contains('Rain', regex=False).to_numpy()
+        X[:, 5] = orders['Priority'].map(self.priority_map).to_numpy(dtype=float)
+        X[np.isnan(X)] = 0
+        return X
+
+    def predict_stream(self, source, chunksize=STREAM_CHUNK_ROWS):
+        # source: an iterable of order frames, or a CSV/Parquet path read chunksize rows at a time.
+        # Yields one (Order_ID, delay_risk_score) frame per chunk. Scores are always quantile-based, so
+        # they don't depend on how the input is chunked. Memory is bounded by chunk size.
+        for chunk in self.iter_chunks(source, chunksize):
+            if not len(chunk):
+                continue
+            self.model.n_jobs = -1 if len(chunk) >= PARALLEL_BATCH_ROWS else None
+            scores = self.risk_score(self.model.predict(self.feature_matrix(chunk)))
+            yield pd.DataFrame({'Order_ID': chunk['Order_ID'].to_numpy(), 'delay_risk_score': scores})
+
+    @staticmethod
+    def iter_chunks(source, chunksize):
+        if not isinstance(source, (str, os.PathLike)):
+            yield from source
+        elif str(source).endswith('.parquet'):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=INPUT_COLUMNS):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(source, usecols=INPUT_COLUMNS, parse_dates=['Order_Date'], chunksize=chunksize)
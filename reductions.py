@@ -0,0 +1,79 @@
+# reductions.py
+import numpy as np
+import pandas as pd
+
+# Bounded, deterministic summaries of many points for charts, computed over every selected order
+DENSITY_BINS = 40
+CENTROID_BINS = 10
+OUTLIERS_PER_GROUP = 25
+
+
+def density_grid(x, y, bins=DENSITY_BINS):
+    # 2D histogram of the (x, y) pairs where both are present. counts[i, j] is the number of points
+    # in x bin i and y bin j; x and y are the bin centres.
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    present = np.isfinite(x) & np.isfinite(y)
+    if not present.any():
+        return {'counts': np.zeros((0, 0)), 'x': np.zeros(0), 'y': np.zeros(0)}
+    counts, x_edges, y_edges = np.histogram2d(x[present], y[present], bins=bins)
+    return {'counts': counts, 'x': (x_edges[:-1] + x_edges[1:]) / 2, 'y': (y_edges[:-1] + y_edges[1:]) / 2}
+
+
+def bin_means(frame, columns, bins=CENTROID_BINS, values=()):
+    # Rows grouped into an equal-width grid over `columns` (rows missing a coordinate are dropped).
+    # One row per non-empty bin with the mean of each column and value, and the bin's order count.
+    names = list(columns) + list(values)
+    data = frame[names].to_numpy(dtype=float)
+    coords = data[:, :len(columns)]
+    present = np.isfinite(coords).all(axis=1)
+    data, coords = data[present], coords[present]
+    if not len(data):
+        return pd.DataFrame(columns=names + ['orders'])
+    low, high = coords.min(axis=0), coords.max(axis=0)
+    span = np.where(high > low, high - low, 1)
+    index = np.minimum(((coords - low) / span * bins).astype(np.int64), bins - 1)
+    cell = np.ravel_multi_index(tuple(index.T), (bins,) * len(columns))
+    cells, inverse, counts = np.unique(cell, return_inverse=True, return_counts=True)
+    means = {}
+    for position, name in enumerate(names):
+        column = data[:, position]
+        finite = np.isfinite(column)
+        sums = np.bincount(inverse[finite], weights=column[finite], minlength=len(cells))
+        present_counts = np.bincount(inverse[finite], minlength=len(cells))
+        means[name] = sums / np.where(present_counts, present_counts, np.nan)
+    means['orders'] = counts
+    return pd.DataFrame(means)
+
+
+def group_means(frame, group, value, rows=None):
+    # Order count and mean `value` per category of the categorical column `group`, over the rows at
+    # positions (or boolean mask) `rows`, all rows if None. One bincount pass over the category codes;
+    # rows without a category are skipped, as are categories with no selected rows.
+    codes = frame[group].cat.codes.to_numpy()
+    values = frame[value].to_numpy(dtype=float)
+    if rows is not None:
+        codes, values = codes[rows], values[rows]
+    present = codes >= 0
+    codes, values = codes[present], values[present]
+    size = len(frame[group].cat.categories)
+    orders = np.bincount(codes, minlength=size)
+    finite = np.isfinite(values)
+    sums = np.bincount(codes[finite], weights=values[finite], minlength=size)
+    counts = np.bincount(codes[finite], minlength=size)
+    result = pd.DataFrame({group: frame[group].cat.categories, 'orders': orders,
+                           value: sums / np.where(counts, counts, np.nan)})
+    return result[orders > 0].reset_index(drop=True)
+
+
+def top_k_by_group(frame, value, group, k=OUTLIERS_PER_GROUP):
+    # The k rows with the largest `value` in each `group` (ties go to the earlier row; missing values
+    # are never picked), in their original order
+    values = frame[value].to_numpy(dtype=float)
+    codes = pd.factorize(frame[group])[0]
+    order = np.lexsort((np.arange(len(frame)), -values, codes))
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(order) else np.zeros(0, dtype=int)
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    picked = order[(rank < k) & ~np.isnan(values[order])]
+    return frame.iloc[np.sort(picked)]
@@ -3,16 +3,34 @@ NexGen Logistics Analytics Dashboard
 High-End UI | Interactive Onboarding | Dynamic Visualizations | Professional Design
 """
 
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+from datetime import datetime
 import warnings
+import data_store
+import cube
+import view_cache
+import order_index
+import export
+import reductions
+import analytics
 warnings.filterwarnings("ignore")
 
+EXPORT_LABELS = {'csv': 'CSV', 'csv.gz': 'CSV (gzip)', 'parquet': 'Parquet'}
+
+# Charts computed and shown in each dashboard view; KPIs and insights are shown in all of them
+VIEW_SECTIONS = {
+    'Executive Overview': ['priority', 'category', 'cost_breakdown', 'daily'],
+    'Operational Details': ['delay_distance', 'carrier', 'route_heatmap', 'scatter_3d'],
+    'Predictive Analytics': ['delay_distance', 'daily', 'scatter_3d'],
+}
+
 # =========================
 # PAGE CONFIG & ADVANCED STYLING
 # =========================
@@ -374,53 +392,43 @@ if 'user_prefs' not in st.session_state:
 # =========================
 # DATA LOADING
 # =========================
-@st.cache_data
-def load_data():
-    try:
-        orders = pd.read_csv("data/orders.csv")
-        vehicles = pd.read_csv("data/vehicle_fleet.csv")
-        routes = pd.read_csv("data/routes_distance.csv")
-        delivery = pd.read_csv("data/delivery_performance.csv")
-        feedback = pd.read_csv("data/customer_feedback.csv")
-        cost = pd.read_csv("data/cost_breakdown.csv")
-        inventory = pd.read_csv("data/warehouse_inventory.csv")
+@st.cache_resource(max_entries=1)
+def load_tables(data_version):
+    # Shared across sessions without per-rerun copies; data_version keys it to the current store build.
+    # Only the current version is kept, so each append doesn't leave another copy of the data in memory.
+    return data_store.load_tables()
 
-        # Data processing
-        orders['Special_Handling'] = orders['Special_Handling'].fillna('None')
-        routes['Weather_Impact'] = routes['Weather_Impact'].fillna('None')
-        delivery['Quality_Issue'] = delivery['Quality_Issue'].fillna('Perfect')
-        orders['Order_Date'] = pd.to_datetime(orders['Order_Date'], errors='coerce')
+@st.cache_resource(max_entries=1)
+def load_cube(data_version):
+    # Pre-aggregated cells for the filter dimensions; only partitions changed by the last append are re-aggregated
+    return cube.load()
 
-        # Derived metrics
-        np.random.seed(42)
-        weight_ranges = {
-            'Electronics': (1, 10), 'Fashion': (0.3, 2), 'Food & Beverage': (2, 30),
-            'Healthcare': (0.5, 6), 'Industrial': (15, 120), 'Books': (0.4, 4), 'Home Goods': (5, 40)
-        }
-        orders['weight_kg'] = orders['Product_Category'].apply(
-            lambda x: round(np.random.uniform(*weight_ranges.get(x, (1, 10))), 2)
-        )
+@st.cache_resource(max_entries=1)
+def load_order_index(data_version):
+    return order_index.OrderIndex(load_tables(data_version)[0])
 
-        delivery['delay_days'] = delivery['Actual_Delivery_Days'] - delivery['Promised_Delivery_Days']
-        delivery['delay_min'] = np.maximum(delivery['delay_days'], 0) * 1440
-        delivery['on_time'] = (delivery['delay_days'] <= 0).astype(int)
+@st.cache_resource(max_entries=1)
+def load_bitmap_index(data_version):
+    return order_index.BitmapIndex(load_tables(data_version)[0])
 
-        cost['total_cost'] = cost[[
-            'Fuel_Cost', 'Labor_Cost', 'Vehicle_Maintenance', 'Insurance',
-            'Packaging_Cost', 'Technology_Platform_Fee', 'Other_Overhead'
-        ]].sum(axis=1)
+@st.cache_resource
+def get_view_cache():
+    # One LRU cache for all sessions, so popular filter combinations are served hot
+    return view_cache.ViewCache()
 
-        orders = orders.merge(routes[['Order_ID', 'Distance_KM', 'Traffic_Delay_Minutes']], on='Order_ID', how='left')
-        orders = orders.merge(delivery[['Order_ID', 'Delivery_Status', 'Customer_Rating', 'on_time', 'delay_min']], on='Order_ID', how='left')
-        orders = orders.merge(cost[['Order_ID', 'total_cost']], on='Order_ID', how='left')
+def discard_export():
+    # Delete this session's prepared export file, if any
+    prepared = st.session_state.pop('export_file', None)
+    if prepared:
+        try:
+            os.remove(prepared['path'])
+        except FileNotFoundError:  # already swept by export.remove_stale
+            pass
 
-        orders['co2_kg'] = orders['Distance_KM'] * 0.4
-        orders['cost_per_km'] = orders['total_cost'] / orders['Distance_KM'].replace(0, np.nan)
-
-        cutoff_date = datetime(2025, 11, 1) - timedelta(days=30)
-        orders['status'] = np.where(orders['Order_Date'] >= cutoff_date, 'Pending', 'Completed')
-
-        return orders, vehicles, delivery, feedback, inventory
+def load_data():
+    try:
+        data_version = data_store.refresh()
+        return data_version, load_tables(data_version)
 
     except FileNotFoundError:
         st.error("⚠️ Data files not found. Please ensure all CSV files are in the 'data' folder.")
@@ -573,23 +581,49 @@ else:
     # =========================
     
     # Load data
-    orders, vehicles, delivery, feedback, inventory = load_data()
+    data_version, (orders, vehicles, delivery, feedback, inventory) = load_data()
     
     # Apply filters based on user preferences
     prefs = st.session_state.user_prefs
-    filtered = orders[
-        orders['Priority'].isin(prefs['priorities']) &
-        orders['Product_Category'].isin(prefs['categories']) &
-        orders['Origin'].isin(prefs['origins'])
-    ]
+    # Reruns with the same data and filters (button clicks, toggles) reuse the cached view below
+    views = get_view_cache()
+    view = view_cache.view_key(data_version, prefs)
+
+    def cached(name, compute):
+        return views.get((view, name), compute)
+
+    def cached_figure(name, build):
+        # Stored as JSON: restoring a figure skips the aggregation and plotly express work
+        return pio.from_json(cached(f'figure:{name}', lambda: build().to_json()))
+
+    # Orders are sorted by date, so the time range is a contiguous slice; the value filters are then
+    # resolved over that slice with the bitmap index
+    window, window_start, window_end = load_order_index(data_version).window(prefs['time_range'])
+    rows = cached('rows', lambda: load_bitmap_index(data_version).select({
+        'Priority': prefs['priorities'],
+        'Product_Category': prefs['categories'],
+        'Origin': prefs['origins'],
+    }, window))
+
+    def filtered(columns=None):
+        # The selected orders (only `columns` if given), gathered inside the reduction computes so
+        # cached views and views without those charts never copy them
+        if columns is None:
+            return orders.iloc[rows]
+        return orders.iloc[rows, [orders.columns.get_loc(column) for column in columns]]
+
+    # Aggregates come from the cube, so they cost the same whatever the order volume
+    cells = cached('cells', lambda: cube.select(load_cube(data_version), prefs['priorities'], prefs['categories'],
+                                                prefs['origins'], window_start, window_end))
     
     # Calculate metrics
-    total_orders = len(filtered)
-    on_time_rate = filtered['on_time'].mean() * 100 if not filtered['on_time'].isna().all() else 0
-    avg_cost_per_km = filtered['cost_per_km'].mean() if not filtered['cost_per_km'].isna().all() else 0
-    total_co2 = filtered['co2_kg'].sum() if not filtered['co2_kg'].isna().all() else 0
-    avg_delay = filtered['delay_min'].mean() if not filtered['delay_min'].isna().all() else 0
-    total_revenue = filtered['total_cost'].sum() if not filtered['total_cost'].isna().all() else 0
+    kpis = cached('kpis', lambda: analytics.kpis(cells))
+    total_orders = kpis['total_orders']
+    on_time_rate = kpis['on_time_rate']
+    avg_cost_per_km = kpis['avg_cost_per_km']
+    total_co2 = kpis['total_co2']
+    avg_delay = kpis['avg_delay']
+    total_revenue = kpis['total_revenue']
     
     # Header
     st.markdown("""
@@ -637,335 +671,367 @@ else:
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    # Charts Section
-    col1, col2 = st.columns(2)
+    # Charts Section: only the charts in the active view are computed and sent
+    view_modes = list(VIEW_SECTIONS)
+    if 'active_view' not in st.session_state:
+        st.session_state.active_view = prefs['view_mode']
+    prefs['view_mode'] = st.radio("📊 Dashboard View", view_modes, horizontal=True, key='active_view')
+    sections = VIEW_SECTIONS[prefs['view_mode']]
+
+    def chart_slots(left, right):
+        # Side by side when both charts are in the view, otherwise whichever is shown gets the full width
+        if left in sections and right in sections:
+            return st.columns(2)
+        return st.container(), st.container()
+
+    col1, col2 = chart_slots('delay_distance', 'priority')
     
     # Chart 1: Delay vs Distance Scatter
-    with col1:
-        st.markdown('<div class="chart-container"><div class="chart-title">🎯 Delay vs Distance Analysis</div>', unsafe_allow_html=True)
-        fig1 = px.scatter(
-            filtered.sample(min(200, len(filtered))),
-            x='Distance_KM',
-            y='delay_min',
-            color='Priority',
-            size='weight_kg',
-            hover_data=['Order_ID', 'Product_Category', 'Customer_Rating'],
-            color_discrete_map={'Express': '#FF4444', 'Standard': '#00D4FF', 'Economy': '#00FFC2'},
-            template='plotly_dark'
-        )
-        fig1.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=400,
-            margin=dict(l=0, r=0, t=0, b=0)
-        )
-        st.plotly_chart(fig1, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+    if 'delay_distance' in sections:
+        with col1:
+            st.markdown('<div class="chart-container"><div class="chart-title">🎯 Delay vs Distance Analysis</div>', unsafe_allow_html=True)
+            def build_fig1():
+                # Density of all selected orders, with the most delayed orders per priority drawn on top
+                grid = cached('reduction:delay_density', lambda: reductions.density_grid(*filtered(['Distance_KM', 'delay_min']).to_numpy(dtype=float).T))
+                outliers = cached('reduction:delay_outliers', lambda: reductions.top_k_by_group(filtered(), 'delay_min', 'Priority'))
+                fig1 = go.Figure(go.Heatmap(
+                    x=grid['x'],
+                    y=grid['y'],
+                    z=np.where(grid['counts'] > 0, grid['counts'], np.nan).T,
+                    colorscale='Blues',
+                    showscale=False,
+                    hovertemplate='Distance: %{x:.0f} km<br>Delay: %{y:.0f} min<br>Orders: %{z}<extra></extra>'
+                ))
+                size_ref = 2 * max(outliers['weight_kg'].max(), 1) / 20 ** 2 if len(outliers) else 1
+                for priority, color in {'Express': '#FF4444', 'Standard': '#00D4FF', 'Economy': '#00FFC2'}.items():
+                    points = outliers[outliers['Priority'] == priority]
+                    fig1.add_trace(go.Scatter(
+                        x=points['Distance_KM'],
+                        y=points['delay_min'],
+                        mode='markers',
+                        name=priority,
+                        marker=dict(color=color, size=points['weight_kg'], sizemode='area', sizeref=size_ref, sizemin=3),
+                        customdata=points[['Order_ID', 'Product_Category', 'Customer_Rating']],
+                        hovertemplate='%{customdata[0]} (%{customdata[1]})<br>Distance: %{x:.0f} km<br>Delay: %{y:.0f} min<br>Rating: %{customdata[2]}<extra></extra>'
+                    ))
+                fig1.update_layout(
+                    template='plotly_dark',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    height=400,
+                    margin=dict(l=0, r=0, t=0, b=0),
+                    xaxis_title='Distance (km)',
+                    yaxis_title='Delay (min)'
+                )
+                return fig1
+            st.plotly_chart(cached_figure('delay_distance', build_fig1), use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
     
     # Chart 2: Priority Distribution
-    with col2:
-        st.markdown('<div class="chart-container"><div class="chart-title">📊 Priority Distribution</div>', unsafe_allow_html=True)
-        priority_data = filtered['Priority'].value_counts().reset_index()
-        priority_data.columns = ['Priority', 'Count']
-        fig2 = px.pie(
-            priority_data,
-            names='Priority',
-            values='Count',
-            hole=0.5,
-            color='Priority',
-            color_discrete_map={'Express': '#FF4444', 'Standard': '#00D4FF', 'Economy': '#00FFC2'},
-            template='plotly_dark'
-        )
-        fig2.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=400,
-            margin=dict(l=0, r=0, t=0, b=0),
-            showlegend=True
-        )
-        st.plotly_chart(fig2, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+    if 'priority' in sections:
+        with col2:
+            st.markdown('<div class="chart-container"><div class="chart-title">📊 Priority Distribution</div>', unsafe_allow_html=True)
+            def build_fig2():
+                priority_data = analytics.priority_counts(cells)
+                priority_data.columns = ['Priority', 'Count']
+                fig2 = px.pie(
+                    priority_data,
+                    names='Priority',
+                    values='Count',
+                    hole=0.5,
+                    color='Priority',
+                    color_discrete_map={'Express': '#FF4444', 'Standard': '#00D4FF', 'Economy': '#00FFC2'},
+                    template='plotly_dark'
+                )
+                fig2.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    height=400,
+                    margin=dict(l=0, r=0, t=0, b=0),
+                    showlegend=True
+                )
+                return fig2
+            st.plotly_chart(cached_figure('priority', build_fig2), use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
     
     # Chart 3: Category Performance
-    st.markdown('<div class="chart-container"><div class="chart-title">🏆 Category Performance Analysis</div>', unsafe_allow_html=True)
-    category_data = filtered.groupby('Product_Category').agg({
-        'Order_ID': 'count',
-        'total_cost': 'sum',
-        'on_time': 'mean',
-        'co2_kg': 'sum'
-    }).reset_index()
-    category_data.columns = ['Category', 'Orders', 'Revenue', 'On-Time Rate', 'CO2']
-    category_data['On-Time Rate'] = category_data['On-Time Rate'] * 100
-    
-    fig3 = make_subplots(
-        rows=1, cols=2,
-        subplot_titles=('Orders & Revenue', 'On-Time Performance'),
-        specs=[[{'type': 'bar'}, {'type': 'bar'}]]
-    )
-    
-    fig3.add_trace(
-        go.Bar(
-            x=category_data['Category'],
-            y=category_data['Orders'],
-            name='Orders',
-            marker_color='#00D4FF',
-            hovertemplate='%{x}<br>Orders: %{y}<extra></extra>'
-        ),
-        row=1, col=1
-    )
-    
-    fig3.add_trace(
-        go.Bar(
-            x=category_data['Category'],
-            y=category_data['On-Time Rate'],
-            name='On-Time %',
-            marker_color='#00FFC2',
-            hovertemplate='%{x}<br>On-Time: %{y:.1f}%<extra></extra>'
-        ),
-        row=1, col=2
-    )
-    
-    fig3.update_layout(
-        template='plotly_dark',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        height=450,
-        showlegend=False,
-        margin=dict(l=0, r=0, t=40, b=0)
-    )
-    fig3.update_xaxes(tickangle=-45)
-    st.plotly_chart(fig3, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+    if 'category' in sections:
+        st.markdown('<div class="chart-container"><div class="chart-title">🏆 Category Performance Analysis</div>', unsafe_allow_html=True)
+        def build_fig3():
+            category_data = analytics.category_summary(cells)
+            category_data.columns = ['Category', 'Orders', 'Revenue', 'On-Time Rate', 'CO2']
+    
+            fig3 = make_subplots(
+                rows=1, cols=2,
+                subplot_titles=('Orders & Revenue', 'On-Time Performance'),
+                specs=[[{'type': 'bar'}, {'type': 'bar'}]]
+            )
     
-    col1, col2 = st.columns(2)
+            fig3.add_trace(
+                go.Bar(
+                    x=category_data['Category'],
+                    y=category_data['Orders'],
+                    name='Orders',
+                    marker_color='#00D4FF',
+                    hovertemplate='%{x}<br>Orders: %{y}<extra></extra>'
+                ),
+                row=1, col=1
+            )
+    
+            fig3.add_trace(
+                go.Bar(
+                    x=category_data['Category'],
+                    y=category_data['On-Time Rate'],
+                    name='On-Time %',
+                    marker_color='#00FFC2',
+                    hovertemplate='%{x}<br>On-Time: %{y:.1f}%<extra></extra>'
+                ),
+                row=1, col=2
+            )
+    
+            fig3.update_layout(
+                template='plotly_dark',
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                height=450,
+                showlegend=False,
+                margin=dict(l=0, r=0, t=40, b=0)
+            )
+            fig3.update_xaxes(tickangle=-45)
+            return fig3
+        st.plotly_chart(cached_figure('category', build_fig3), use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    col1, col2 = chart_slots('carrier', 'cost_breakdown')
     
     # Chart 4: Carrier Performance
-    with col1:
-        st.markdown('<div class="chart-container"><div class="chart-title">🚚 Carrier Performance</div>', unsafe_allow_html=True)
-        carrier_perf = delivery.groupby('Carrier').agg({
-            'on_time': 'mean',
-            'Order_ID': 'count'
-        }).reset_index()
-        carrier_perf.columns = ['Carrier', 'On-Time Rate', 'Orders']
-        carrier_perf['On-Time Rate'] = carrier_perf['On-Time Rate'] * 100
-        carrier_perf = carrier_perf.sort_values('On-Time Rate', ascending=True)
+    if 'carrier' in sections:
+        with col1:
+            st.markdown('<div class="chart-container"><div class="chart-title">🚚 Carrier Performance</div>', unsafe_allow_html=True)
+            def build_fig4():
+                carrier_perf = analytics.carrier_summary(orders, rows)
+                carrier_perf.columns = ['Carrier', 'Orders', 'On-Time Rate']
         
-        fig4 = go.Figure(go.Bar(
-            x=carrier_perf['On-Time Rate'],
-            y=carrier_perf['Carrier'],
-            orientation='h',
-            marker=dict(
-                color=carrier_perf['On-Time Rate'],
-                colorscale='Blues',
-                showscale=False
-            ),
-            text=carrier_perf['On-Time Rate'].apply(lambda x: f'{x:.1f}%'),
-            textposition='outside',
-            hovertemplate='%{y}<br>On-Time: %{x:.1f}%<extra></extra>'
-        ))
+                fig4 = go.Figure(go.Bar(
+                    x=carrier_perf['On-Time Rate'],
+                    y=carrier_perf['Carrier'],
+                    orientation='h',
+                    marker=dict(
+                        color=carrier_perf['On-Time Rate'],
+                        colorscale='Blues',
+                        showscale=False
+                    ),
+                    text=carrier_perf['On-Time Rate'].apply(lambda x: f'{x:.1f}%'),
+                    textposition='outside',
+                    hovertemplate='%{y}<br>On-Time: %{x:.1f}%<extra></extra>'
+                ))
         
-        fig4.update_layout(
-            template='plotly_dark',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=400,
-            margin=dict(l=0, r=0, t=0, b=0),
-            xaxis_title='On-Time Rate (%)',
-            yaxis_title=''
-        )
-        st.plotly_chart(fig4, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+                fig4.update_layout(
+                    template='plotly_dark',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    height=400,
+                    margin=dict(l=0, r=0, t=0, b=0),
+                    xaxis_title='On-Time Rate (%)',
+                    yaxis_title=''
+                )
+                return fig4
+            st.plotly_chart(cached_figure('carrier', build_fig4), use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
     
     # Chart 5: Cost Breakdown
-    with col2:
-        st.markdown('<div class="chart-container"><div class="chart-title">💰 Cost Breakdown</div>', unsafe_allow_html=True)
-        cost_breakdown = {
-            'Category': ['Fuel', 'Labor', 'Maintenance', 'Insurance', 'Packaging', 'Platform Fee', 'Other'],
-            'Amount': [35000, 28000, 15000, 12000, 8000, 6000, 4000]
-        }
-        cost_df = pd.DataFrame(cost_breakdown)
+    if 'cost_breakdown' in sections:
+        with col2:
+            st.markdown('<div class="chart-container"><div class="chart-title">💰 Cost Breakdown</div>', unsafe_allow_html=True)
+            def build_fig5():
+                # Component totals over the filtered orders, in data_store.COST_COLUMNS order
+                cost_df = pd.DataFrame({
+                    'Category': ['Fuel', 'Labor', 'Maintenance', 'Insurance', 'Packaging', 'Platform Fee', 'Other'],
+                    'Amount': analytics.cost_breakdown(cells).to_numpy()
+                })
         
-        fig5 = go.Figure(data=[go.Pie(
-            labels=cost_df['Category'],
-            values=cost_df['Amount'],
-            hole=0.4,
-            marker=dict(
-                colors=['#FF4444', '#00D4FF', '#00FFC2', '#FFD700', '#FF8C00', '#9370DB', '#20B2AA'],
-                line=dict(color='#0a0e27', width=2)
-            ),
-            textinfo='label+percent',
-            textposition='outside',
-            hovertemplate='%{label}<br>₹%{value:,.0f}<extra></extra>'
-        )])
+                fig5 = go.Figure(data=[go.Pie(
+                    labels=cost_df['Category'],
+                    values=cost_df['Amount'],
+                    hole=0.4,
+                    marker=dict(
+                        colors=['#FF4444', '#00D4FF', '#00FFC2', '#FFD700', '#FF8C00', '#9370DB', '#20B2AA'],
+                        line=dict(color='#0a0e27', width=2)
+                    ),
+                    textinfo='label+percent',
+                    textposition='outside',
+                    hovertemplate='%{label}<br>₹%{value:,.0f}<extra></extra>'
+                )])
         
-        fig5.update_layout(
-            template='plotly_dark',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=400,
-            margin=dict(l=0, r=0, t=0, b=0),
-            showlegend=False
-        )
-        st.plotly_chart(fig5, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+                fig5.update_layout(
+                    template='plotly_dark',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    height=400,
+                    margin=dict(l=0, r=0, t=0, b=0),
+                    showlegend=False
+                )
+                return fig5
+            st.plotly_chart(cached_figure('cost_breakdown', build_fig5), use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
     
     # Chart 6: Time Series Analysis
-    st.markdown('<div class="chart-container"><div class="chart-title">📈 Daily Order Trends</div>', unsafe_allow_html=True)
-    daily_orders = filtered.groupby(filtered['Order_Date'].dt.date).agg({
-        'Order_ID': 'count',
-        'on_time': 'mean',
-        'total_cost': 'sum'
-    }).reset_index()
-    daily_orders.columns = ['Date', 'Orders', 'On-Time Rate', 'Revenue']
-    daily_orders['On-Time Rate'] = daily_orders['On-Time Rate'] * 100
-    
-    fig6 = make_subplots(
-        rows=2, cols=1,
-        subplot_titles=('Daily Orders Volume', 'On-Time Performance Trend'),
-        vertical_spacing=0.15,
-        specs=[[{'type': 'scatter'}], [{'type': 'scatter'}]]
-    )
-    
-    fig6.add_trace(
-        go.Scatter(
-            x=daily_orders['Date'],
-            y=daily_orders['Orders'],
-            mode='lines+markers',
-            name='Orders',
-            line=dict(color='#00D4FF', width=3),
-            marker=dict(size=8, color='#00D4FF'),
-            fill='tozeroy',
-            fillcolor='rgba(0, 212, 255, 0.2)',
-            hovertemplate='Date: %{x}<br>Orders: %{y}<extra></extra>'
-        ),
-        row=1, col=1
-    )
-    
-    fig6.add_trace(
-        go.Scatter(
-            x=daily_orders['Date'],
-            y=daily_orders['On-Time Rate'],
-            mode='lines+markers',
-            name='On-Time %',
-            line=dict(color='#00FFC2', width=3),
-            marker=dict(size=8, color='#00FFC2'),
-            fill='tozeroy',
-            fillcolor='rgba(0, 255, 194, 0.2)',
-            hovertemplate='Date: %{x}<br>On-Time: %{y:.1f}%<extra></extra>'
-        ),
-        row=2, col=1
-    )
-    
-    fig6.update_layout(
-        template='plotly_dark',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        height=600,
-        showlegend=False,
-        margin=dict(l=0, r=0, t=40, b=0)
-    )
-    fig6.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(255,255,255,0.1)')
-    fig6.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(255,255,255,0.1)')
-    st.plotly_chart(fig6, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+    if 'daily' in sections:
+        st.markdown('<div class="chart-container"><div class="chart-title">📈 Daily Order Trends</div>', unsafe_allow_html=True)
+        def build_fig6():
+            daily_orders = analytics.daily_summary(cells)
+            daily_orders.columns = ['Date', 'Orders', 'On-Time Rate', 'Revenue']
+            daily_orders['Date'] = daily_orders['Date'].dt.date
+    
+            fig6 = make_subplots(
+                rows=2, cols=1,
+                subplot_titles=('Daily Orders Volume', 'On-Time Performance Trend'),
+                vertical_spacing=0.15,
+                specs=[[{'type': 'scatter'}], [{'type': 'scatter'}]]
+            )
+    
+            fig6.add_trace(
+                go.Scatter(
+                    x=daily_orders['Date'],
+                    y=daily_orders['Orders'],
+                    mode='lines+markers',
+                    name='Orders',
+                    line=dict(color='#00D4FF', width=3),
+                    marker=dict(size=8, color='#00D4FF'),
+                    fill='tozeroy',
+                    fillcolor='rgba(0, 212, 255, 0.2)',
+                    hovertemplate='Date: %{x}<br>Orders: %{y}<extra></extra>'
+                ),
+                row=1, col=1
+            )
+    
+            fig6.add_trace(
+                go.Scatter(
+                    x=daily_orders['Date'],
+                    y=daily_orders['On-Time Rate'],
+                    mode='lines+markers',
+                    name='On-Time %',
+                    line=dict(color='#00FFC2', width=3),
+                    marker=dict(size=8, color='#00FFC2'),
+                    fill='tozeroy',
+                    fillcolor='rgba(0, 255, 194, 0.2)',
+                    hovertemplate='Date: %{x}<br>On-Time: %{y:.1f}%<extra></extra>'
+                ),
+                row=2, col=1
+            )
+    
+            fig6.update_layout(
+                template='plotly_dark',
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                height=600,
+                showlegend=False,
+                margin=dict(l=0, r=0, t=40, b=0)
+            )
+            fig6.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(255,255,255,0.1)')
+            fig6.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(255,255,255,0.1)')
+            return fig6
+        st.plotly_chart(cached_figure('daily', build_fig6), use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
     
     # Chart 7: 3D Scatter - Distance vs Cost vs Weight
-    st.markdown('<div class="chart-container"><div class="chart-title">🎲 3D Analysis: Distance vs Cost vs Weight</div>', unsafe_allow_html=True)
-    sample_data = filtered.sample(min(150, len(filtered)))
-    
-    fig7 = go.Figure(data=[go.Scatter3d(
-        x=sample_data['Distance_KM'],
-        y=sample_data['total_cost'],
-        z=sample_data['weight_kg'],
-        mode='markers',
-        marker=dict(
-            size=6,
-            color=sample_data['delay_min'],
-            colorscale='Viridis',
-            showscale=True,
-            colorbar=dict(title='Delay (min)', x=1.1),
-            line=dict(width=0.5, color='rgba(255,255,255,0.3)')
-        ),
-        text=sample_data['Priority'],
-        hovertemplate='Distance: %{x:.0f} km<br>Cost: ₹%{y:.0f}<br>Weight: %{z:.1f} kg<br>Priority: %{text}<extra></extra>'
-    )])
-    
-    fig7.update_layout(
-        template='plotly_dark',
-        scene=dict(
-            xaxis=dict(title='Distance (km)', backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(255,255,255,0.1)'),
-            yaxis=dict(title='Cost (₹)', backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(255,255,255,0.1)'),
-            zaxis=dict(title='Weight (kg)', backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(255,255,255,0.1)'),
-            bgcolor='rgba(0,0,0,0)'
-        ),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        height=600,
-        margin=dict(l=0, r=0, t=0, b=0)
-    )
-    st.plotly_chart(fig7, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+    if 'scatter_3d' in sections and st.toggle("🎲 Load 3D Analysis: Distance vs Cost vs Weight", key='show_scatter_3d'):
+        st.markdown('<div class="chart-container"><div class="chart-title">🎲 3D Analysis: Distance vs Cost vs Weight</div>', unsafe_allow_html=True)
+        def build_fig7():
+            # One point per occupied cell of a 10×10×10 grid (at the cell's mean position, sized by its
+            # order count), plus the most delayed orders per priority
+            centroids = cached('reduction:centroids_3d', lambda: reductions.bin_means(
+                filtered(['Distance_KM', 'total_cost', 'weight_kg', 'delay_min']),
+                ['Distance_KM', 'total_cost', 'weight_kg'], values=['delay_min']))
+            outliers = cached('reduction:delay_outliers', lambda: reductions.top_k_by_group(filtered(), 'delay_min', 'Priority'))
+            delay_range = dict(cmin=0, cmax=max(centroids['delay_min'].max(), outliers['delay_min'].max(), 1) if len(centroids) else 1)
+    
+            fig7 = go.Figure(data=[go.Scatter3d(
+                x=centroids['Distance_KM'],
+                y=centroids['total_cost'],
+                z=centroids['weight_kg'],
+                mode='markers',
+                name='Orders',
+                marker=dict(
+                    size=4 + 12 * np.sqrt(centroids['orders'] / max(centroids['orders'].max(), 1)) if len(centroids) else 6,
+                    color=centroids['delay_min'],
+                    colorscale='Viridis',
+                    showscale=True,
+                    colorbar=dict(title='Delay (min)', x=1.1),
+                    line=dict(width=0.5, color='rgba(255,255,255,0.3)'),
+                    **delay_range
+                ),
+                text=centroids['orders'],
+                hovertemplate='Distance: %{x:.0f} km<br>Cost: ₹%{y:.0f}<br>Weight: %{z:.1f} kg<br>Orders: %{text}<extra></extra>'
+            ), go.Scatter3d(
+                x=outliers['Distance_KM'],
+                y=outliers['total_cost'],
+                z=outliers['weight_kg'],
+                mode='markers',
+                name='Most delayed',
+                marker=dict(
+                    size=5,
+                    symbol='diamond',
+                    color=outliers['delay_min'],
+                    colorscale='Viridis',
+                    line=dict(width=1, color='#FF4444'),
+                    **delay_range
+                ),
+                text=outliers['Priority'],
+                hovertemplate='Distance: %{x:.0f} km<br>Cost: ₹%{y:.0f}<br>Weight: %{z:.1f} kg<br>Priority: %{text}<extra></extra>'
+            )])
+    
+            fig7.update_layout(
+                template='plotly_dark',
+                scene=dict(
+                    xaxis=dict(title='Distance (km)', backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(255,255,255,0.1)'),
+                    yaxis=dict(title='Cost (₹)', backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(255,255,255,0.1)'),
+                    zaxis=dict(title='Weight (kg)', backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(255,255,255,0.1)'),
+                    bgcolor='rgba(0,0,0,0)'
+                ),
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                height=600,
+                margin=dict(l=0, r=0, t=0, b=0),
+                showlegend=False
+            )
+            return fig7
+        st.plotly_chart(cached_figure('scatter_3d', build_fig7), use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
     
     # Chart 8: Heatmap - Origin to Destination
-    st.markdown('<div class="chart-container"><div class="chart-title">🗺️ Route Heatmap: Origin × Destination</div>', unsafe_allow_html=True)
-    route_matrix = filtered.groupby(['Origin', 'Destination']).size().reset_index(name='Count')
-    route_pivot = route_matrix.pivot(index='Origin', columns='Destination', values='Count').fillna(0)
-    
-    fig8 = go.Figure(data=go.Heatmap(
-        z=route_pivot.values,
-        x=route_pivot.columns,
-        y=route_pivot.index,
-        colorscale='Blues',
-        hovertemplate='From: %{y}<br>To: %{x}<br>Orders: %{z}<extra></extra>',
-        colorbar=dict(title='Orders')
-    ))
-    
-    fig8.update_layout(
-        template='plotly_dark',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        height=500,
-        margin=dict(l=0, r=0, t=0, b=0),
-        xaxis_title='Destination',
-        yaxis_title='Origin'
-    )
-    st.plotly_chart(fig8, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+    if 'route_heatmap' in sections and st.toggle("🗺️ Load Route Heatmap: Origin × Destination", key='show_route_heatmap'):
+        st.markdown('<div class="chart-container"><div class="chart-title">🗺️ Route Heatmap: Origin × Destination</div>', unsafe_allow_html=True)
+        def build_fig8():
+            route_matrix = analytics.route_counts(cells).rename(columns={'orders': 'Count'})
+            route_pivot = route_matrix.pivot(index='Origin', columns='Destination', values='Count').fillna(0)
+    
+            fig8 = go.Figure(data=go.Heatmap(
+                z=route_pivot.values,
+                x=route_pivot.columns,
+                y=route_pivot.index,
+                colorscale='Blues',
+                hovertemplate='From: %{y}<br>To: %{x}<br>Orders: %{z}<extra></extra>',
+                colorbar=dict(title='Orders')
+            ))
+    
+            fig8.update_layout(
+                template='plotly_dark',
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                height=500,
+                margin=dict(l=0, r=0, t=0, b=0),
+                xaxis_title='Destination',
+                yaxis_title='Origin'
+            )
+            return fig8
+        st.plotly_chart(cached_figure('route_heatmap', build_fig8), use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
     
     # Insights Section
     st.markdown('<div class="chart-container"><div class="chart-title">💡 AI-Powered Insights & Recommendations</div>', unsafe_allow_html=True)
     
-    insights = []
-    
-    # Performance insight
-    if on_time_rate >= 90:
-        insights.append(("✅ **Excellent Performance**: Your on-time delivery rate of {:.1f}% exceeds industry standards (85%). Keep up the great work!".format(on_time_rate), "success"))
-    elif on_time_rate >= 75:
-        insights.append(("⚠️ **Room for Improvement**: On-time rate at {:.1f}%. Consider optimizing routes in high-delay zones.".format(on_time_rate), "warning"))
-    else:
-        insights.append(("🚨 **Action Required**: On-time rate of {:.1f}% is below target. Immediate operational review recommended.".format(on_time_rate), "danger"))
-    
-    # Cost insight
-    if avg_cost_per_km < 40:
-        insights.append(("💰 **Cost Efficient**: Your average cost of ₹{:.1f}/km is below industry average. Excellent cost management!".format(avg_cost_per_km), "success"))
-    else:
-        insights.append(("💸 **Cost Optimization**: At ₹{:.1f}/km, consider fuel efficiency programs or route optimization to reduce costs.".format(avg_cost_per_km), "warning"))
-    
-    # Carbon footprint
-    avg_co2_per_order = total_co2 / max(total_orders, 1)
-    if avg_co2_per_order < 150:
-        insights.append(("🌱 **Eco-Friendly**: Average {:.0f} kg CO₂ per order. Consider carbon offset programs to achieve net-zero.".format(avg_co2_per_order), "success"))
-    else:
-        insights.append(("🌍 **Sustainability Focus**: High carbon footprint detected ({:.0f} kg CO₂/order). Recommend electric vehicle adoption for urban routes.".format(avg_co2_per_order), "warning"))
-    
-    # Priority analysis
-    express_pct = len(filtered[filtered['Priority'] == 'Express']) / max(len(filtered), 1) * 100
-    if express_pct > 40:
-        insights.append(("⚡ **Premium Demand**: {:.0f}% Express orders indicate strong premium segment. Consider capacity expansion.".format(express_pct), "success"))
-    
-    # Delay patterns
-    if avg_delay > 120:
-        insights.append(("⏱️ **Delay Alert**: Average delay of {:.0f} minutes detected. High-traffic routes need alternative planning.".format(avg_delay), "danger"))
+    insights = cached('insights', lambda: analytics.insights(kpis, analytics.express_share(cells)))
     
     for insight_text, insight_type in insights:
         st.markdown(f'<div class="insight-card {insight_type}"><div class="insight-text">{insight_text}</div></div>', unsafe_allow_html=True)
@@ -978,85 +1044,40 @@ else:
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.markdown('<div class="chart-title">📥 Export Dashboard Data</div>', unsafe_allow_html=True)
     
-    export_data = filtered.copy()
-    
-    export_columns = {
-        'Order_ID': 'Order ID',
-        'Order_Date': 'Order Date',
-        'Priority': 'Priority Level',
-        'Product_Category': 'Product Category',
-        'Origin': 'Origin City',
-        'Destination': 'Destination City',
-        'Distance_KM': 'Distance (KM)',
-        'Traffic_Delay_Minutes': 'Traffic Delay (Minutes)',
-        'Weather_Impact': 'Weather Impact',
-        'weight_kg': 'Weight (KG)',
-        'Delivery_Status': 'Delivery Status',
-        'Customer_Rating': 'Customer Rating (1-5)',
-        'delay_min': 'Total Delay (Minutes)',
-        'on_time': 'On-Time Delivery (1=Yes, 0=No)',
-        'total_cost': 'Total Cost (₹)',
-        'cost_per_km': 'Cost per KM (₹)',
-        'co2_kg': 'CO2 Emissions (KG)',
-        'status': 'Order Status'
-    }
-    
-    available_cols = {k: v for k, v in export_columns.items() if k in export_data.columns}
-    export_df = export_data[list(available_cols.keys())].copy()
-    export_df.columns = list(available_cols.values())
-    
-    if 'Distance (KM)' in export_df.columns:
-        export_df['Distance (KM)'] = export_df['Distance (KM)'].round(2)
-    if 'Weight (KG)' in export_df.columns:
-        export_df['Weight (KG)'] = export_df['Weight (KG)'].round(2)
-    if 'Total Cost (₹)' in export_df.columns:
-        export_df['Total Cost (₹)'] = export_df['Total Cost (₹)'].round(2)
-    if 'Cost per KM (₹)' in export_df.columns:
-        export_df['Cost per KM (₹)'] = export_df['Cost per KM (₹)'].round(2)
-    if 'CO2 Emissions (KG)' in export_df.columns:
-        export_df['CO2 Emissions (KG)'] = export_df['CO2 Emissions (KG)'].round(2)
-    
-    if 'Order Date' in export_df.columns:
-        export_df = export_df.sort_values('Order Date', ascending=False)
-    
-    summary_df = pd.DataFrame({
-        'Order ID': ['SUMMARY STATISTICS'],
-        'Order Date': [f'Report Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'],
-        'Priority Level': [f'Total Orders: {len(export_df)}'],
-        'Product Category': [f'Categories: {export_df["Product Category"].nunique() if "Product Category" in export_df.columns else "N/A"}'],
-        'Origin City': [f'Origins: {export_df["Origin City"].nunique() if "Origin City" in export_df.columns else "N/A"}'],
-        'Destination City': [f'Destinations: {export_df["Destination City"].nunique() if "Destination City" in export_df.columns else "N/A"}'],
-        'Distance (KM)': [f'{export_df["Distance (KM)"].sum():.2f}' if 'Distance (KM)' in export_df.columns else 'N/A'],
-        'Traffic Delay (Minutes)': [f'{export_df["Traffic Delay (Minutes)"].sum():.0f}' if 'Traffic Delay (Minutes)' in export_df.columns else 'N/A'],
-        'Weather Impact': ['Various'],
-        'Weight (KG)': [f'{export_df["Weight (KG)"].sum():.2f}' if 'Weight (KG)' in export_df.columns else 'N/A'],
-        'Delivery Status': ['Multiple'],
-        'Customer Rating (1-5)': [f'{export_df["Customer Rating (1-5)"].mean():.2f}' if 'Customer Rating (1-5)' in export_df.columns else 'N/A'],
-        'Total Delay (Minutes)': [f'{export_df["Total Delay (Minutes)"].sum():.0f}' if 'Total Delay (Minutes)' in export_df.columns else 'N/A'],
-        'On-Time Delivery (1=Yes, 0=No)': [f'{export_df["On-Time Delivery (1=Yes, 0=No)"].mean()*100:.1f}%' if 'On-Time Delivery (1=Yes, 0=No)' in export_df.columns else 'N/A'],
-        'Total Cost (₹)': [f'{export_df["Total Cost (₹)"].sum():.2f}' if 'Total Cost (₹)' in export_df.columns else 'N/A'],
-        'Cost per KM (₹)': [f'{export_df["Cost per KM (₹)"].mean():.2f}' if 'Cost per KM (₹)' in export_df.columns else 'N/A'],
-        'CO2 Emissions (KG)': [f'{export_df["CO2 Emissions (KG)"].sum():.2f}' if 'CO2 Emissions (KG)' in export_df.columns else 'N/A'],
-        'Order Status': ['Summary']
-    })
-    
-    final_export = pd.concat([summary_df, pd.DataFrame([{}] * 2), export_df], ignore_index=True)
-    csv = final_export.to_csv(index=False).encode('utf-8')
-    
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        st.download_button(
-            label="⬇️ Download Complete Report (CSV)",
-            data=csv,
-            file_name=f"nexgen_logistics_detailed_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv",
-            use_container_width=True
-        )
+        export_format = st.radio("Format", list(EXPORT_LABELS), format_func=EXPORT_LABELS.get, horizontal=True, key='export_format')
+        # The report is only generated on request, streamed in chunks into a temp file
+        # Files of sessions that closed without cleaning up expire after export.EXPORT_TTL_S
+        export.remove_stale()
+        prepared = st.session_state.get('export_file')
+        if prepared and (prepared['key'] != (view, export_format) or not os.path.exists(prepared['path'])):
+            discard_export()
+        if st.button("📦 Prepare Report", use_container_width=True):
+            discard_export()
+            with st.spinner("Generating report..."):
+                path = export.write(orders, load_order_index(data_version).newest_first(rows), export_format)
+            st.session_state.export_file = {
+                'key': (view, export_format),
+                'path': path,
+                'file_name': f"nexgen_logistics_detailed_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}{export.FORMATS[export_format][0]}"
+            }
+        prepared = st.session_state.get('export_file')
+        if prepared:
+            with open(prepared['path'], 'rb') as report:
+                st.download_button(
+                    label=f"⬇️ Download Complete Report ({EXPORT_LABELS[export_format]})",
+                    data=report,
+                    file_name=prepared['file_name'],
+                    mime=export.FORMATS[export_format][1],
+                    use_container_width=True
+                )
     
+    summary_note = "📈 Summary statistics included at top of file" if export_format != 'parquet' else "📈 Parquet keeps column types; summary statistics are CSV only"
     st.markdown(f"""
     <div style='text-align: center; color: #8B92B8; margin-top: 1rem; font-size: 0.9rem;'>
-        📊 Report includes {len(export_df)} orders with {len(available_cols)} data columns<br>
-        📈 Summary statistics included at top of file
+        📊 Report includes {len(rows)} orders with {len(export.export_columns(orders))} data columns<br>
+        {summary_note}
     </div>
     """, unsafe_allow_html=True)
     
@@ -1084,6 +1105,7 @@ else:
     st.sidebar.markdown('<div class="filter-title">⚙️ Settings</div>', unsafe_allow_html=True)
     
     if st.sidebar.button("🔄 Reset Dashboard", use_container_width=True):
+        discard_export()
         st.session_state.onboarding_complete = False
         st.session_state.step = 0
         st.session_state.user_prefs = {
@@ -1103,5 +1125,9 @@ else:
     st.sidebar.markdown(f"**Priorities:** {len(prefs['priorities'])}", unsafe_allow_html=True)
     st.sidebar.markdown(f"**Categories:** {len(prefs['categories'])}", unsafe_allow_html=True)
     st.sidebar.markdown(f"**Origins:** {len(prefs['origins'])}", unsafe_allow_html=True)
+    if window_start is not None:
+        st.sidebar.markdown(f"**Time Range:** Last {prefs['time_range']} days ({window_start:%d %b} – {window_end:%d %b %Y})", unsafe_allow_html=True)
+    else:
+        st.sidebar.markdown(f"**Time Range:** Last {prefs['time_range']} days", unsafe_allow_html=True)
     st.sidebar.markdown(f"**View Mode:** {prefs['view_mode']}", unsafe_allow_html=True)
     st.sidebar.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
@@ -0,0 +1,73 @@
+# view_cache.py
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def view_key(data_version, prefs):
+    # Everything a dashboard view depends on; selection order doesn't change the view, so lists are sorted
+    parts = [data_version, sorted(prefs['priorities']), sorted(prefs['categories']),
+             sorted(prefs['origins']), prefs['time_range']]
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()[:16]
+
+
+def size_of(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class ViewCache:
+    # LRU cache of computed views shared by all sessions, bounded by the estimated size of its values.
+    # Cached values are shared, so callers must not modify them.
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+        # Computed outside the lock so a slow view doesn't block other sessions; if two sessions miss
+        # on the same key at once, both compute and the last one is kept
+        value = compute()
+        size = size_of(value)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            if size <= self.max_bytes:
+                self.entries[key] = (value, size)
+                self.total_bytes += size
+                while self.total_bytes > self.max_bytes:
+                    _, (_, evicted) = self.entries.popitem(last=False)
+                    self.total_bytes -= evicted
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0